@@ -110,6 +110,43 @@ for await (const line of rl) {
       })();
       break;
     }
+    case 'kv.mset': {
+      const { entries } = payload;
+      const res = await client.kv.mset.rpc({ entries });
+      if (res.ok) {
+        console.log(`${id} -- ok:${res.payload.vs.join(',')}`);
+      } else {
+        console.log(`${id} -- err:${res.payload.code}`);
+      }
+      break;
+    }
+    case 'kv.mget': {
+      const { ks } = payload;
+      const res = await client.kv.mget.rpc({ ks });
+      if (res.ok) {
+        console.log(`${id} -- ok:${res.payload.vs.join(',')}`);
+      } else {
+        console.log(`${id} -- err:${res.payload.code}`);
+      }
+      break;
+    }
+    case 'kv.watch_prefix': {
+      const { prefix } = payload;
+      const [res] = await client.kv.watch_prefix.subscribe({ prefix });
+      void (async () => {
+        for await (const v of res) {
+          if (v.ok) {
+            const changes = v.payload.changes
+              .map((change) => `${change.k}=${change.v}`)
+              .join(',');
+            console.log(`${id} -- ok:${changes}`);
+          } else {
+            console.log(`${id} -- err:${v.payload.code}`);
+          }
+        }
+      })();
+      break;
+    }
     case 'repeat.echo': {
       const handle = handles.get(id);
       if (!handle) {
@@ -28,12 +28,20 @@ uv run python -m replit_river.codegen \
     --output ./src/testservice/protos \
     "${REPO_ROOT_DIR}/protos/testservice/protos/service.proto"
 
+uv run python "${REPO_ROOT_DIR}/scripts/fast-river-codecs.py" \
+  ./src/testservice/protos/service_river.py \
+  testservice.protos.service_pb2
+
 uv run python -m replit_river.codegen \
   client \
     --output ./src/testservice/protos \
     --client-name TestCient \
     "${REPO_ROOT_DIR}/schema.json"
 
+uv run python "${REPO_ROOT_DIR}/scripts/fast-river-client.py" \
+  ./src/testservice/protos \
+  testservice.protos
+
 "${REPO_ROOT_DIR}/scripts/patch-grpc.sh" "$(pwd)"
 
 if ! uv run ruff check --fix; then
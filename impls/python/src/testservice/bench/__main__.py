@@ -0,0 +1,182 @@
+"""Throughput and latency of the kv, repeat and upload services over a loopback session.
+
+python -m testservice.bench --output bench.json [--baseline previous.json]
+
+Starts a river.Server with the test servicers on localhost and drives TestCient
+against it in the same process, so no container setup is timed. The JSON results
+are meant to be kept per commit and compared with --baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from typing import Any, AsyncIterator, Optional
+
+from testservice import loop
+from testservice.bench.echo import echo
+from testservice.bench.loopback import loopback
+from testservice.protos import TestCient
+from testservice.protos.kv.set import SetInput
+from testservice.protos.upload.send import SendInput
+
+TIMEOUT = timedelta(seconds=60)
+
+
+def percentile(sorted_ms: list[float], p: float) -> float:
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * p / 100))]
+
+
+async def rpcs(
+    test_client: TestCient, calls: int, concurrency: int
+) -> dict[str, float]:
+    """kv.set with `concurrency` calls in flight, `calls` in total."""
+    latencies_ms: list[float] = []
+
+    async def caller(n: int) -> None:
+        for i in range(n, calls, concurrency):
+            started = time.perf_counter()
+            await test_client.kv.set(SetInput(k=f"key-{n}", v=i), TIMEOUT)
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies_ms.sort()
+    return {
+        "per_sec": calls / elapsed,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p99_ms": percentile(latencies_ms, 99),
+    }
+
+
+async def upload(
+    test_client: TestCient, uploads: int, size: int, part_size: int
+) -> float:
+    """MB per second sent through upload.send, as `uploads` documents of `size`
+    characters in `part_size` character parts."""
+    full_parts, rest = divmod(size, part_size)
+
+    async def parts() -> AsyncIterator[SendInput]:
+        for _ in range(full_parts):
+            yield SendInput(part="x" * part_size)
+        if rest:
+            yield SendInput(part="x" * rest)
+        yield SendInput(part="EOF")
+
+    started = time.perf_counter()
+    for _ in range(uploads):
+        await test_client.upload.send(parts())
+    return uploads * size / 1e6 / (time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    async with loopback() as test_client:
+        # Connect, and let one-time work happen, before anything is timed.
+        await rpcs(test_client, 100, 1)
+        return {
+            "rpc": await rpcs(test_client, args.calls, 1),
+            "rpc_concurrent": await rpcs(test_client, args.calls, args.concurrency),
+            "stream_messages_per_sec": await echo(test_client, args.messages),
+            "upload_mb_per_sec": await upload(
+                test_client, args.uploads, args.upload_kb * 1000, args.part_kb * 1000
+            ),
+        }
+
+
+def median(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """The median of each measurement across `runs`."""
+    return {
+        key: median([run[key] for run in runs])
+        if isinstance(value, dict)
+        else statistics.median(run[key] for run in runs)
+        for key, value in runs[0].items()
+    }
+
+
+def commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Print each measurement's change from `baseline` to stderr."""
+    before = flatten(baseline["results"])
+    for key, value in flatten(results["results"]).items():
+        if before.get(key):
+            change = (value / before[key] - 1) * 100
+            print(
+                f"{key}: {before[key]:.4g} -> {value:.4g} ({change:+.1f}%)",
+                file=sys.stderr,
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput and latency of the test services over loopback."
+    )
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="RPCs in flight at once."
+    )
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--uploads", type=int, default=8)
+    # The document comes back in the response, and the client's websocket rejects
+    # messages over 1 MiB.
+    parser.add_argument(
+        "--upload-kb", type=int, default=1000, help="Size of each uploaded document."
+    )
+    parser.add_argument("--part-kb", type=int, default=64)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs to take the median of."
+    )
+    parser.add_argument("--output", help="Also write the results to this file.")
+    parser.add_argument("--baseline", help="Results file to compare against.")
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "loop": "asyncio" if loop.loop_factory() is None else "uvloop",
+        "args": {
+            k: v for k, v in vars(args).items() if k not in ("output", "baseline")
+        },
+        "results": median([loop.run(run(args)) for _ in range(args.repeat)]),
+    }
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
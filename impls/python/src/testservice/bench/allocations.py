@@ -0,0 +1,96 @@
+"""Memory the generated client code allocates per call, measured with tracemalloc.
+
+python -m testservice.bench.allocations --calls 5000
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import tracemalloc
+from datetime import timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from testservice.protos import TestCient
+from testservice.protos.kv.set import SetInput
+from testservice.protos.kv.watch import WatchInput
+from testservice.protos.repeat.echo import EchoInput
+
+# Where allocations count as the generated code's.
+GENERATED = "*/testservice/protos/*"
+TIMEOUT = timedelta(seconds=60)
+
+
+class HoldingClient:
+    """Stands in for river.Client, keeping the arguments of every call alive.
+
+    Anything the generated code allocates for a call, like the serializers it
+    passes, then stays traced until the snapshot is taken. The arguments are copied
+    out of the call's own tuple, which river.Client would not keep.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[list[Any]] = []
+
+    async def send_rpc(self, *args: Any) -> None:
+        self.calls.append(list(args))
+
+    def send_subscription(self, *args: Any) -> None:
+        self.calls.append(list(args))
+
+    def send_stream(self, *args: Any) -> None:
+        self.calls.append(list(args))
+
+
+async def blocks_per_call(
+    call: Callable[[TestCient], Awaitable[Any]], calls: int, strict: bool
+) -> float:
+    holding = HoldingClient()
+    test_client = TestCient(holding, strict)  # type: ignore[arg-type]
+    await call(test_client)  # Let one-time work happen before tracing.
+    tracemalloc.start()
+    for _ in range(calls):
+        await call(test_client)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(
+        stat.count
+        for stat in snapshot.statistics("filename")
+        if fnmatch.fnmatch(stat.traceback[0].filename, GENERATED)
+    )
+    return blocks / calls
+
+
+async def run(calls: int) -> dict[str, float]:
+    set_input = SetInput(k="key", v=1)
+    watch_input = WatchInput(k="key")
+
+    async def no_inputs() -> AsyncIterator[EchoInput]:
+        for _ in ():
+            yield EchoInput(str="")
+
+    procedures: dict[str, Callable[[TestCient], Awaitable[Any]]] = {
+        "kv.set": lambda c: c.kv.set(set_input, TIMEOUT),
+        "kv.watch": lambda c: c.kv.watch(watch_input),
+        "repeat.echo": lambda c: c.repeat.echo(no_inputs()),
+    }
+    results = {}
+    for name, call in procedures.items():
+        for mode, strict in (("strict", True), ("trusted", False)):
+            results[f"{name}_{mode}_blocks_per_call"] = await blocks_per_call(
+                call, calls, strict
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Allocations made by the generated client code per call."
+    )
+    parser.add_argument("--calls", type=int, default=5_000)
+    args = parser.parse_args()
+    print(json.dumps({"calls": args.calls, **asyncio.run(run(args.calls))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
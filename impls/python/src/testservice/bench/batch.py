@@ -0,0 +1,58 @@
+"""Loading keys with single kv.set calls vs one kv.mset, over a loopback River session.
+
+python -m testservice.bench.batch --keys 10000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+
+from testservice.bench.loopback import loopback
+from testservice.protos.kv.mget import MgetInput
+from testservice.protos.kv.mset import MsetInput, MsetInputEntries
+from testservice.protos.kv.set import SetInput
+
+TIMEOUT = timedelta(seconds=60)
+
+
+async def run(args: argparse.Namespace) -> dict[str, float]:
+    async with loopback() as test_client:
+        started = time.perf_counter()
+        for i in range(args.keys):
+            await test_client.kv.set(SetInput(k=f"single-{i}", v=i), TIMEOUT)
+        single = time.perf_counter() - started
+
+        entries = [MsetInputEntries(k=f"batch-{i}", v=i) for i in range(args.keys)]
+        started = time.perf_counter()
+        await test_client.kv.mset(MsetInput(entries=entries), TIMEOUT)
+        batch = time.perf_counter() - started
+
+        keys = [f"batch-{i}" for i in range(args.keys)]
+        started = time.perf_counter()
+        await test_client.kv.mget(MgetInput(ks=keys), TIMEOUT)
+        batch_get = time.perf_counter() - started
+    return {
+        "single_set_seconds": single,
+        "mset_seconds": batch,
+        "mget_seconds": batch_get,
+        "speedup": single / batch,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Single kv.set calls vs one kv.mset over a loopback session."
+    )
+    parser.add_argument("--keys", type=int, default=10_000)
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    print(json.dumps({"keys": args.keys, **asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Per-message cost of the River <-> protobuf codecs in service_river.
+
+Each message type is timed with the generated encoder and decoder, and with
+reference codecs that copy fields one statement at a time, the way river.codegen
+emits them.
+
+python -m testservice.bench.codec --number 100000
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable
+
+from google.protobuf.descriptor import Descriptor, FieldDescriptor
+
+from testservice.protos import service_pb2, service_river
+
+# Number of items given to repeated fields in the sample payloads.
+REPEATED_ITEMS = 16
+
+
+def sample(descriptor: Descriptor) -> dict[str, Any]:
+    payload: dict[str, Any] = {}
+    for field in descriptor.fields:
+        if field.message_type is not None:
+            value: Any = sample(field.message_type)
+        elif field.type == FieldDescriptor.TYPE_STRING:
+            value = f"{field.name}-value"
+        else:
+            value = 1.5
+        if field.label == FieldDescriptor.LABEL_REPEATED:
+            value = [value] * REPEATED_ITEMS
+        payload[field.name] = value
+    return payload
+
+
+def reference_codecs() -> dict[str, Any]:
+    """Compile codecs in the shape river.codegen emits: one statement per field."""
+    source = []
+    for name, descriptor in service_pb2.DESCRIPTOR.message_types_by_name.items():
+        encode = [f"def _{name}Encoder(e):", "    d = {}"]
+        decode = [f"def _{name}Decoder(d):", f"    m = service_pb2.{name}()"]
+        for field in descriptor.fields:
+            key = repr(field.name)
+            value = f"_{field.name}"
+            if field.message_type is not None:
+                nested = field.message_type.name
+                if field.label == FieldDescriptor.LABEL_REPEATED:
+                    value = f"[_{nested}Encoder(item) for item in {value}]"
+                    set_field = (
+                        f"m.{field.name}.extend("
+                        f"_{nested}Decoder(item) for item in d[{key}])"
+                    )
+                else:
+                    value = f"_{nested}Encoder({value})"
+                    set_field = f"m.{field.name}.MergeFrom(_{nested}Decoder(d[{key}]))"
+            elif field.label == FieldDescriptor.LABEL_REPEATED:
+                value = f"list({value})"
+                set_field = f"m.{field.name}.MergeFrom(d[{key}])"
+            else:
+                set_field = f"setattr(m, {key}, d[{key}])"
+            encode += [
+                f"    _{field.name} = e.{field.name}",
+                f"    if _{field.name} is not None:",
+                f"        d[{key}] = {value}",
+            ]
+            decode += [f"    if d.get({key}) is not None:", f"        {set_field}"]
+        source += [*encode, "    return d", *decode, "    return m"]
+    namespace: dict[str, Any] = {"service_pb2": service_pb2}
+    exec("\n".join(source), namespace)
+    return namespace
+
+
+def ns_per_call(fn: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-message cost of the generated River <-> protobuf codecs."
+    )
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    reference = reference_codecs()
+    results: dict[str, dict[str, float]] = {}
+    for name, descriptor in service_pb2.DESCRIPTOR.message_types_by_name.items():
+        encode = getattr(service_river, f"_{name}Encoder")
+        decode = getattr(service_river, f"_{name}Decoder")
+        reference_encode = reference[f"_{name}Encoder"]
+        reference_decode = reference[f"_{name}Decoder"]
+        payload = sample(descriptor)
+        message = decode(payload)
+        assert message == reference_decode(payload), name
+        assert encode(message) == reference_encode(message), name
+        results[name] = {
+            "encode_ns": ns_per_call(lambda: encode(message), args.number),
+            "reference_encode_ns": ns_per_call(
+                lambda: reference_encode(message), args.number
+            ),
+            "decode_ns": ns_per_call(lambda: decode(payload), args.number),
+            "reference_decode_ns": ns_per_call(
+                lambda: reference_decode(payload), args.number
+            ),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
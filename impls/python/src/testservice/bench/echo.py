@@ -0,0 +1,89 @@
+"""Stream throughput of repeat.echo and repeat.echo_prefix over a loopback session.
+
+python -m testservice.bench.echo --messages 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import AsyncIterator
+
+from grpc import ServicerContext
+
+from testservice.bench.loopback import loopback
+from testservice.protos import TestCient, service_pb2
+from testservice.protos.repeat.echo import EchoInput
+from testservice.protos.repeat.echo_prefix import Echo_PrefixInit, Echo_PrefixInput
+from testservice.server import RepeatServicer
+
+
+class UnbatchedRepeatServicer(RepeatServicer):
+    """Awaits every input on its own, for comparison with the batched handlers."""
+
+    async def echo(  # type: ignore[override]
+        self,
+        request_iterator: AsyncIterator[service_pb2.EchoInput],
+        context: ServicerContext,
+    ) -> AsyncIterator[service_pb2.EchoOutput]:
+        async for request in request_iterator:
+            yield service_pb2.EchoOutput(out=request.str)
+
+
+async def echo(test_client: TestCient, messages: int) -> float:
+    async def inputs() -> AsyncIterator[EchoInput]:
+        for i in range(messages):
+            yield EchoInput(str=str(i))
+
+    started = time.perf_counter()
+    received = 0
+    async for _ in await test_client.repeat.echo(inputs()):
+        received += 1
+        if received == messages:
+            break
+    return messages / (time.perf_counter() - started)
+
+
+async def echo_prefix(test_client: TestCient, messages: int) -> float:
+    async def inputs() -> AsyncIterator[Echo_PrefixInput]:
+        for i in range(messages):
+            yield Echo_PrefixInput(str=str(i))
+
+    started = time.perf_counter()
+    received = 0
+    init = Echo_PrefixInit(prefix="p-")
+    async for _ in await test_client.repeat.echo_prefix(init, inputs()):
+        received += 1
+        if received == messages:
+            break
+    return messages / (time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> dict[str, float]:
+    async with loopback(repeat=UnbatchedRepeatServicer()) as test_client:
+        unbatched = await echo(test_client, args.messages)
+    async with loopback() as test_client:
+        batched = await echo(test_client, args.messages)
+        prefixed = await echo_prefix(test_client, args.messages)
+    return {
+        "echo_unbatched_per_sec": unbatched,
+        "echo_per_sec": batched,
+        "echo_prefix_per_sec": prefixed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stream throughput of repeat.echo and repeat.echo_prefix."
+    )
+    parser.add_argument("--messages", type=int, default=5_000)
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    print(json.dumps({"messages": args.messages, **asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
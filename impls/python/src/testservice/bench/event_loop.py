@@ -0,0 +1,105 @@
+"""The volume and interleaving test workloads on asyncio's loop vs uvloop.
+
+python -m testservice.bench.event_loop --messages 5000 --rounds 500
+
+Server and client share one loop, like the other loopback benchmarks, so each
+number includes both sides' time on that loop.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Any, AsyncIterator
+
+from testservice import loop
+from testservice.bench.echo import echo
+from testservice.bench.loopback import loopback
+from testservice.protos import TestCient
+from testservice.protos.kv.set import SetInput
+from testservice.protos.kv.watch import WatchInput
+from testservice.protos.repeat.echo import EchoInput
+from testservice.protos.upload.send import SendInput
+
+TIMEOUT = timedelta(seconds=60)
+LOOPS = ("asyncio", "uvloop")
+
+
+async def many_rpcs(test_client: TestCient, calls: int) -> float:
+    """kv.set calls per second, one at a time, as in the ManyRpcs test."""
+    started = time.perf_counter()
+    for i in range(calls):
+        await test_client.kv.set(SetInput(k="foo", v=i), TIMEOUT)
+    return calls / (time.perf_counter() - started)
+
+
+async def interleaving_round(test_client: TestCient, key: str) -> None:
+    """Every procedure at once, as in the ComplexInterleavingAllProcedures test."""
+    await test_client.kv.set(SetInput(k=key, v=42), TIMEOUT)
+
+    async def watch() -> None:
+        updates = 0
+        async for _ in await test_client.kv.watch(WatchInput(k=key)):
+            updates += 1
+            if updates == 1:
+                await test_client.kv.set(SetInput(k=key, v=1), TIMEOUT)
+            else:
+                break
+
+    async def echo_inputs() -> AsyncIterator[EchoInput]:
+        for s in ("hello", "world"):
+            yield EchoInput(str=s)
+
+    async def echoes() -> None:
+        received = 0
+        async for _ in await test_client.repeat.echo(echo_inputs()):
+            received += 1
+            if received == 2:
+                break
+
+    async def parts() -> AsyncIterator[SendInput]:
+        for part in ("abc", "def", "EOF"):
+            yield SendInput(part=part)
+
+    await asyncio.gather(watch(), echoes(), test_client.upload.send(parts()))
+
+
+async def interleaving(test_client: TestCient, rounds: int) -> float:
+    started = time.perf_counter()
+    for i in range(rounds):
+        await interleaving_round(test_client, f"key-{i}")
+    return rounds / (time.perf_counter() - started)
+
+
+async def run(args: argparse.Namespace) -> dict[str, float]:
+    async with loopback() as test_client:
+        return {
+            "many_rpcs_per_sec": await many_rpcs(test_client, args.messages),
+            "many_streams_per_sec": await echo(test_client, args.messages),
+            "interleaving_rounds_per_sec": await interleaving(test_client, args.rounds),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Test workloads on asyncio's event loop vs uvloop."
+    )
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    results: dict[str, Any] = {"messages": args.messages, "rounds": args.rounds}
+    for name in LOOPS:
+        if name != "asyncio" and loop.loop_factory(name) is None:
+            results[name] = "not installed"
+            continue
+        results[name] = loop.run(run(args), name)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
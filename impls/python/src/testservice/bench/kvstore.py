@@ -0,0 +1,68 @@
+"""Memory per key of KvStore versus the previous dict-of-Observables layout.
+
+python -m testservice.bench.kvstore --keys 1000000
+"""
+
+import argparse
+import json
+import tracemalloc
+from typing import Any, Callable
+
+from testservice.kvstore import KvStore
+
+
+class DictObservable:
+    """The per-key object KvServicer kept before KvStore."""
+
+    def __init__(self, initial_value: float):
+        self.value = initial_value
+        self.listeners: list[Callable[[float], Any]] = []
+
+
+def populate_dict(keys: list[str]) -> object:
+    kv: dict[str, DictObservable] = {}
+    for i, key in enumerate(keys):
+        kv[key] = DictObservable(float(i))
+    return kv
+
+
+def populate_kvstore(keys: list[str]) -> object:
+    kv = KvStore()
+    for i, key in enumerate(keys):
+        kv.set(key, float(i))
+    return kv
+
+
+def measure(populate: Callable[[list[str]], object], keys: list[str]) -> int:
+    """Bytes allocated by `populate`, excluding the key strings themselves."""
+    tracemalloc.start()
+    try:
+        store = populate(keys)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del store
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Memory per key of KvStore versus a dict of Observables."
+    )
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    keys = [f"key-{i}" for i in range(args.keys)]
+    results = {
+        name: measure(populate, keys) / args.keys
+        for name, populate in (
+            ("dict_observable", populate_dict),
+            ("kvstore", populate_kvstore),
+        )
+    }
+    results["ratio"] = results["dict_observable"] / results["kvstore"]
+    print(json.dumps({"keys": args.keys, "bytes_per_key": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
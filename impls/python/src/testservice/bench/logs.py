@@ -0,0 +1,104 @@
+"""Event loop time spent on logging, written inline vs from testservice.logs' thread.
+
+python -m testservice.bench.logs --messages 5000 --repeat 3
+
+Runs the ManyRpcs and ManyStreams workloads over a loopback session with root
+logging at DEBUG, as the client and server run by default, through:
+
+- inline: a StreamHandler called on the event loop, as logging.basicConfig sets up
+- background: testservice.logs.BackgroundHandler
+- background_info: the same at LOG_LEVEL=INFO, where river's debug records are
+  dropped when they are logged
+
+Loop thread time per call or message is the event loop's CPU time, from
+time.thread_time, so it leaves out the writer thread. Process time includes it.
+Records go to --log-file, /dev/null by default.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from typing import Awaitable, Callable, TextIO
+
+from testservice.bench.echo import echo
+from testservice.bench.event_loop import many_rpcs
+from testservice.bench.loopback import loopback
+from testservice.logs import FORMAT, BackgroundHandler
+from testservice.protos import TestCient
+
+MODES = ("inline", "background", "background_info")
+
+
+def handler(mode: str, stream: TextIO) -> logging.Handler:
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(logging.Formatter(FORMAT))
+    if mode == "inline":
+        return writer
+    return BackgroundHandler(writer)
+
+
+async def measure(
+    workload: Callable[[TestCient, int], Awaitable[float]], messages: int
+) -> dict[str, float]:
+    async with loopback() as test_client:
+        # Connect before anything is timed.
+        await many_rpcs(test_client, 10)
+        thread_started = time.thread_time()
+        process_started = time.process_time()
+        per_sec = await workload(test_client, messages)
+        thread_us = (time.thread_time() - thread_started) / messages * 1e6
+        process_us = (time.process_time() - process_started) / messages * 1e6
+    return {"per_sec": per_sec, "loop_thread_us": thread_us, "process_us": process_us}
+
+
+def run(mode: str, args: argparse.Namespace, stream: TextIO) -> dict[str, float]:
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(handler(mode, stream))
+    root.setLevel(logging.INFO if mode == "background_info" else logging.DEBUG)
+    try:
+        results = {}
+        for name, workload in (("many_rpcs", many_rpcs), ("many_streams", echo)):
+            for key, value in asyncio.run(measure(workload, args.messages)).items():
+                results[f"{name}_{key}"] = value
+        return results
+    finally:
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+            # Writes out whatever the background thread has left.
+            existing.close()
+        root.setLevel(logging.WARNING)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Event loop time spent logging, inline vs from a thread."
+    )
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs to take the median of."
+    )
+    parser.add_argument("--log-file", default="/dev/null")
+    args = parser.parse_args()
+
+    runs: dict[str, list[dict[str, float]]] = {mode: [] for mode in MODES}
+    with open(args.log_file, "w") as stream:
+        for _ in range(args.repeat):
+            for mode in MODES:
+                runs[mode].append(run(mode, args, stream))
+    results = {
+        mode: {
+            key: statistics.median(r[key] for r in mode_runs) for key in mode_runs[0]
+        }
+        for mode, mode_runs in runs.items()
+    }
+    print(json.dumps({"messages": args.messages, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""A River server and client connected over a loopback websocket."""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import replit_river as river
+from replit_river.transport_options import TransportOptions, UriAndMetadata
+from websockets import serve
+
+from testservice.protos import TestCient, service_river
+from testservice.server import KvServicer, RepeatServicer, UploadServicer
+
+# Unacknowledged messages each side may buffer. Acks only arrive with heartbeats, so
+# a smaller buffer stalls bursts of messages until the next heartbeat.
+BUFFER_SIZE = 100_000
+
+
+@asynccontextmanager
+async def loopback(
+    kv: Optional[KvServicer] = None,
+    repeat: Optional[RepeatServicer] = None,
+    strict: bool = False,
+) -> AsyncIterator[TestCient]:
+    """Serve the test services on an ephemeral port and yield a connected client."""
+    server = river.Server(
+        server_id="bench-server",
+        transport_options=TransportOptions(buffer_size=BUFFER_SIZE),
+    )
+    kv = kv or KvServicer(data_dir=None)
+    service_river.add_kvServicer_to_server(kv, server)  # type: ignore
+    service_river.add_uploadServicer_to_server(UploadServicer(), server)  # type: ignore
+    repeat = repeat or RepeatServicer()
+    service_river.add_repeatServicer_to_server(repeat, server)  # type: ignore
+    async with serve(server.serve, host="127.0.0.1", port=0) as ws_server:
+        port = next(iter(ws_server.sockets)).getsockname()[1]
+
+        async def get_connection_metadata() -> UriAndMetadata[None]:
+            return {"uri": f"ws://127.0.0.1:{port}", "metadata": None}
+
+        client = river.Client(
+            get_connection_metadata,
+            client_id="bench-client",
+            server_id="bench-server",
+            transport_options=TransportOptions(buffer_size=BUFFER_SIZE),
+        )
+        try:
+            yield TestCient(client, strict)
+        finally:
+            await client.close()
@@ -0,0 +1,124 @@
+"""Cost of the /metrics instrumentation on the volume test workloads.
+
+python -m testservice.bench.metrics --messages 5000 --repeat 5
+
+The end-to-end runs alternate between plain and instrumented servicers, and each
+number is the median over --repeat runs. On a noisy machine that is still not
+precise enough to resolve a few percent, so the handlers are also called directly,
+without a transport, and the overhead is estimated as the extra time per call or
+message over the end-to-end time per call or message.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from typing import AsyncIterator, cast
+
+from grpc import ServicerContext
+
+from testservice.bench.echo import echo
+from testservice.bench.event_loop import many_rpcs
+from testservice.bench.loopback import loopback
+from testservice.metrics import Metrics
+from testservice.protos import service_pb2
+from testservice.server import KvServicer, RepeatServicer
+
+
+async def direct(
+    kv: KvServicer, repeat: RepeatServicer, calls: int
+) -> tuple[float, float]:
+    """Microseconds per kv.set call and per repeat.echo message, with no transport."""
+    context = cast(ServicerContext, None)
+    request = service_pb2.KVRequest(k="key", v=1)
+    started = time.perf_counter()
+    for _ in range(calls):
+        await kv.set(request, context)
+    set_us = (time.perf_counter() - started) / calls * 1e6
+
+    async def inputs() -> AsyncIterator[service_pb2.EchoInput]:
+        for _ in range(calls):
+            yield service_pb2.EchoInput(str="x")
+
+    started = time.perf_counter()
+    async for _ in repeat.echo(inputs(), context):
+        pass
+    echo_us = (time.perf_counter() - started) / calls * 1e6
+    return set_us, echo_us
+
+
+async def volume(messages: int, instrumented: bool) -> tuple[float, float]:
+    kv = KvServicer(data_dir=None)
+    repeat = RepeatServicer()
+    if instrumented:
+        metrics = Metrics()
+        kv = metrics.instrument("kv", kv)
+        repeat = metrics.instrument("repeat", repeat)
+    async with loopback(kv=kv, repeat=repeat) as test_client:
+        return (
+            await many_rpcs(test_client, messages),
+            await echo(test_client, messages),
+        )
+
+
+async def run(args: argparse.Namespace) -> dict[str, float]:
+    runs: dict[bool, list[tuple[float, float]]] = {False: [], True: []}
+    direct_runs: dict[bool, list[tuple[float, float]]] = {False: [], True: []}
+    metrics = Metrics()
+    servicers = {
+        False: (KvServicer(data_dir=None), RepeatServicer()),
+        True: (
+            metrics.instrument("kv", KvServicer(data_dir=None)),
+            metrics.instrument("repeat", RepeatServicer()),
+        ),
+    }
+    for _ in range(args.repeat):
+        for instrumented in (False, True):
+            runs[instrumented].append(await volume(args.messages, instrumented))
+            direct_runs[instrumented].append(
+                await direct(*servicers[instrumented], args.calls)
+            )
+    results = {}
+    for instrumented, name in ((False, "plain"), (True, "instrumented")):
+        rpcs, streams = zip(*runs[instrumented])
+        set_us, echo_us = zip(*direct_runs[instrumented])
+        results[f"many_rpcs_{name}_per_sec"] = statistics.median(rpcs)
+        results[f"many_streams_{name}_per_sec"] = statistics.median(streams)
+        results[f"set_handler_{name}_us"] = statistics.median(set_us)
+        results[f"echo_handler_{name}_us_per_message"] = statistics.median(echo_us)
+    set_extra_us = (
+        results["set_handler_instrumented_us"] - results["set_handler_plain_us"]
+    )
+    echo_extra_us = (
+        results["echo_handler_instrumented_us_per_message"]
+        - results["echo_handler_plain_us_per_message"]
+    )
+    results["many_rpcs_overhead_percent"] = (
+        set_extra_us * results["many_rpcs_plain_per_sec"] / 1e4
+    )
+    results["many_streams_overhead_percent"] = (
+        echo_extra_us * results["many_streams_plain_per_sec"] / 1e4
+    )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Overhead of per-procedure metrics on the volume workloads."
+    )
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--calls", type=int, default=100_000, help="Direct handler calls per run."
+    )
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    print(json.dumps({"messages": args.messages, **asyncio.run(run(args))}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
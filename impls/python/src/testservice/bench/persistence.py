@@ -0,0 +1,72 @@
+"""Throughput of durable kv sets and startup replay time of KvLog.
+
+python -m testservice.bench.persistence --sets 200000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from testservice.kvstore import KvStore
+from testservice.persistence import KvLog
+
+
+async def durable_sets(directory: str, args: argparse.Namespace) -> float:
+    """Sets per second when each set waits for its group to be fsynced."""
+    store = KvStore()
+    log = KvLog(store, directory, snapshot_every=args.snapshot_every)
+    log.load()
+    log.start()
+
+    async def writer(worker: int) -> None:
+        for i in range(worker, args.sets, args.concurrency):
+            key = f"key-{i % args.keys}"
+            await log.append(key, float(i))
+            store.set(key, float(i))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    await log.close()
+    return float(args.sets) / elapsed
+
+
+def replay(directory: str) -> tuple[int, float]:
+    store = KvStore()
+    log = KvLog(store, directory)
+    started = time.perf_counter()
+    records = log.load()
+    return records, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Throughput of durable kv sets and startup replay time."
+    )
+    parser.add_argument("--sets", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--snapshot-every", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        sets_per_sec = asyncio.run(durable_sets(directory, args))
+        records, replay_seconds = replay(directory)
+    print(
+        json.dumps(
+            {
+                "sets": args.sets,
+                "concurrency": args.concurrency,
+                "durable_sets_per_sec": sets_per_sec,
+                "replayed_records": records,
+                "replay_seconds": replay_seconds,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
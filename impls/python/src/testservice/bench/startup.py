@@ -0,0 +1,135 @@
+"""Import time and cold start of the client and server entry points.
+
+python -m testservice.bench.startup --budget-ms 100
+
+Exits with an error if importing an entry point's own modules takes longer than the
+budget, or if it loads a module it has no use for. Time spent in replit_river and
+what it imports is reported but not budgeted, since nothing here can change it.
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules each entry point should not load at startup.
+UNNEEDED = {
+    "testservice.client": (
+        "google.protobuf",
+        "testservice.protos.service_pb2",
+        "testservice.protos.repeat",
+        "testservice.protos.upload",
+    ),
+    "testservice.server": (
+        "google.protobuf.timestamp_pb2",
+        "google.protobuf.wrappers_pb2",
+        "testservice.protos.kv",
+        "testservice.protos.repeat",
+        "testservice.protos.upload",
+    ),
+}
+# The port testservice.server listens on.
+SERVER_PORT = 8080
+IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def import_times(module: str) -> tuple[float, float, set[str]]:
+    """Total and own import time of `module` in ms, and every module it loads.
+
+    Own time counts the module itself and everything first loaded by an import in
+    the testservice package, including third party modules only it pulls in.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = own = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        loaded.add(name)
+        if name == module:
+            total = int(cumulative_us)
+            own += int(self_us)
+        elif len(indent) == 3 and name.startswith("testservice"):
+            own += int(cumulative_us)
+    return total / 1000, own / 1000, loaded
+
+
+def time_to_listen(timeout: float) -> float:
+    """Seconds from launching the server until it accepts a TCP connection."""
+    env = {**os.environ, "SERVER_TRANSPORT_ID": "startup-bench"}
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "testservice.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                socket.create_connection(("127.0.0.1", SERVER_PORT), 0.1).close()
+                return time.perf_counter() - started
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError(f"server exited with {server.returncode}")
+                time.sleep(0.002)
+        raise TimeoutError(f"server did not listen within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Import time and cold start of the client and server."
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100,
+        help="Most each entry point may spend importing its own modules.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--starts", type=int, default=5, help="Server launches to time, 0 to skip."
+    )
+    args = parser.parse_args()
+
+    results: dict[str, float | list[str]] = {"budget_ms": args.budget_ms}
+    failures = []
+    for module, unneeded in UNNEEDED.items():
+        runs = [import_times(module) for _ in range(args.repeat)]
+        total = min(run[0] for run in runs)
+        own = min(run[1] for run in runs)
+        loaded = runs[0][2]
+        results[f"{module}_import_ms"] = total
+        results[f"{module}_own_import_ms"] = own
+        if own > args.budget_ms:
+            failures.append(f"{module} takes {own:.1f}ms to import its own modules")
+        for name in unneeded:
+            if any(m == name or m.startswith(f"{name}.") for m in loaded):
+                failures.append(f"{module} loads {name}")
+    if args.starts:
+        starts = [time_to_listen(timeout=30) * 1000 for _ in range(args.starts)]
+        results["server_listen_ms_median"] = statistics.median(starts)
+        results["server_listen_ms_min"] = min(starts)
+    results["failures"] = failures
+    print(json.dumps(results, indent=2))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
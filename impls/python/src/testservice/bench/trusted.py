@@ -0,0 +1,99 @@
+"""Client message throughput with trusted codecs vs strict pydantic validation.
+
+python -m testservice.bench.trusted --messages 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable
+
+from testservice.bench.echo import echo
+from testservice.bench.loopback import loopback
+from testservice.protos.kv.watch_prefix import (
+    Watch_PrefixOutputTrustedDecoder,
+    Watch_PrefixOutputTypeAdapter,
+)
+from testservice.protos.repeat.echo import (
+    EchoInput,
+    EchoInputTrustedEncoder,
+    EchoInputTypeAdapter,
+    EchoOutputTrustedDecoder,
+    EchoOutputTypeAdapter,
+)
+
+# Changes in each sample kv.watch_prefix frame.
+CHANGES_PER_FRAME = 16
+
+
+def per_sec(codec: Callable[[Any], Any], payload: Any, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        codec(payload)
+    return number / (time.perf_counter() - started)
+
+
+def codecs(number: int) -> dict[str, float]:
+    echo_input = EchoInput(str="hello")
+    echo_output = {"out": "hello"}
+    frame = {
+        "changes": [{"k": f"key-{i}", "v": float(i)} for i in range(CHANGES_PER_FRAME)]
+    }
+    return {
+        "echo_encode_strict_per_sec": per_sec(
+            lambda x: EchoInputTypeAdapter.dump_python(
+                x, by_alias=True, exclude_none=True
+            ),
+            echo_input,
+            number,
+        ),
+        "echo_encode_trusted_per_sec": per_sec(
+            EchoInputTrustedEncoder, echo_input, number
+        ),
+        "echo_decode_strict_per_sec": per_sec(
+            EchoOutputTypeAdapter.validate_python, echo_output, number
+        ),
+        "echo_decode_trusted_per_sec": per_sec(
+            EchoOutputTrustedDecoder, echo_output, number
+        ),
+        "watch_prefix_decode_strict_per_sec": per_sec(
+            Watch_PrefixOutputTypeAdapter.validate_python, frame, number
+        ),
+        "watch_prefix_decode_trusted_per_sec": per_sec(
+            Watch_PrefixOutputTrustedDecoder, frame, number
+        ),
+    }
+
+
+async def streams(messages: int) -> dict[str, float]:
+    results = {}
+    for mode, strict in (("strict", True), ("trusted", False)):
+        async with loopback(strict=strict) as test_client:
+            results[f"echo_stream_{mode}_per_sec"] = await echo(test_client, messages)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Client codec throughput, trusted vs strict validation."
+    )
+    parser.add_argument("--messages", type=int, default=5_000)
+    parser.add_argument(
+        "--number", type=int, default=100_000, help="Calls per codec measurement."
+    )
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {
+        "messages": args.messages,
+        **codecs(args.number),
+        **asyncio.run(streams(args.messages)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
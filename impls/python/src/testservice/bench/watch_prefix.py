@@ -0,0 +1,94 @@
+"""Updating many watched keys: one kv.watch per key vs a single kv.watch_prefix.
+
+python -m testservice.bench.watch_prefix --keys 10000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import timedelta
+from typing import Callable, Coroutine
+
+from testservice.bench.loopback import loopback
+from testservice.protos import TestCient
+from testservice.protos.kv.mset import MsetInput, MsetInputEntries
+from testservice.protos.kv.watch import WatchInput
+from testservice.protos.kv.watch_prefix import Watch_PrefixInput, Watch_PrefixOutput
+
+TIMEOUT = timedelta(seconds=60)
+
+
+async def per_key(test_client: TestCient, keys: list[str], seen: list[int]) -> None:
+    async def watch(key: str) -> None:
+        async for _ in await test_client.kv.watch(WatchInput(k=key)):
+            seen[0] += 1
+
+    await asyncio.gather(*(watch(key) for key in keys))
+
+
+async def prefix(test_client: TestCient, keys: list[str], seen: list[int]) -> None:
+    updates = await test_client.kv.watch_prefix(Watch_PrefixInput(prefix="key-"))
+    async for frame in updates:
+        assert isinstance(frame, Watch_PrefixOutput)
+        seen[0] += len(frame.changes)
+
+
+async def measure(
+    watch: Callable[[TestCient, list[str], list[int]], Coroutine[None, None, None]],
+    args: argparse.Namespace,
+) -> dict[str, float]:
+    keys = [f"key-{i}" for i in range(args.keys)]
+
+    async def mset(value: int) -> None:
+        entries = [MsetInputEntries(k=key, v=value) for key in keys]
+        await test_client.kv.mset(MsetInput(entries=entries), TIMEOUT)
+
+    async def updates(expected: int) -> None:
+        while seen[0] < expected:
+            await asyncio.sleep(0.001)
+
+    async with loopback() as test_client:
+        await mset(0)
+        baseline_tasks = len(asyncio.all_tasks())
+        seen = [0]
+        watcher = asyncio.create_task(watch(test_client, keys, seen))
+        await updates(len(keys))
+        tasks = len(asyncio.all_tasks()) - baseline_tasks
+        started = time.perf_counter()
+        for value in range(1, args.rounds + 1):
+            await mset(value)
+            await updates(len(keys) * (value + 1))
+        elapsed = time.perf_counter() - started
+        watcher.cancel()
+    return {
+        "tasks": tasks,
+        "seconds_per_round": elapsed / args.rounds,
+        "microseconds_per_update": elapsed / (args.rounds * len(keys)) * 1e6,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    return {
+        "watch_per_key": await measure(per_key, args),
+        "watch_prefix": await measure(prefix, args),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="One kv.watch per key vs a single kv.watch_prefix."
+    )
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Per-message debug logging from the server module would dominate the timings.
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    print(json.dumps({"keys": args.keys, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""Connections and RPCs per second served by `testservice.server --workers N`.
+
+python -m testservice.bench.workers --workers 1,2,4 --clients 8 --seconds 5
+
+Each client is its own process. The server picks a worker by source address and
+every loopback connection comes from 127.0.0.1 by default, so each client connects
+from its own 127.0.0.x address: directly when opening bare websockets, and through
+a local relay for its River client, which can't choose its local address. The relay
+costs the same for every N.
+
+The server runs with its own logging configuration, so it spends the same time
+logging as it does under test.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from multiprocessing.synchronize import Barrier
+from typing import Any, Optional
+
+import replit_river as river
+import websockets
+from replit_river.transport_options import TransportOptions, UriAndMetadata
+
+from testservice.bench.loopback import BUFFER_SIZE
+from testservice.bench.startup import SERVER_PORT
+from testservice.protos import TestCient
+from testservice.protos.kv.set import SetInput
+
+SERVER_ID = "workers-bench-server"
+TIMEOUT = timedelta(seconds=30)
+# Loose enough that sessions survive a loop starved by the other processes.
+HEARTBEAT_MS = 5000
+RELAY_CHUNK = 64 * 1024
+
+
+def source_address(client: int) -> str:
+    return f"127.0.0.{client + 2}"
+
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while data := await reader.read(RELAY_CHUNK):
+            writer.write(data)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+class Relay:
+    """Forwards connections to the server, connecting from `source`."""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._server: Optional[asyncio.Server] = None
+        self._forwarding: set[asyncio.Future[Any]] = set()
+
+    async def start(self) -> int:
+        """Start accepting connections and return the port to connect to."""
+        self._server = await asyncio.start_server(self._forward, "127.0.0.1", 0)
+        port: int = self._server.sockets[0].getsockname()[1]
+        return port
+
+    async def _forward(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        upstream_reader, upstream_writer = await asyncio.open_connection(
+            "127.0.0.1", SERVER_PORT, local_addr=(self.source, 0)
+        )
+        forwarding = asyncio.gather(
+            pipe(reader, upstream_writer),
+            pipe(upstream_reader, writer),
+            return_exceptions=True,
+        )
+        self._forwarding.add(forwarding)
+        try:
+            await forwarding
+        finally:
+            self._forwarding.discard(forwarding)
+
+    async def close(self) -> None:
+        """Stop accepting and wait for connections closed on either side to drain."""
+        if self._server is not None:
+            self._server.close()
+        if self._forwarding:
+            await asyncio.wait(self._forwarding, timeout=5)
+
+
+async def connections(source: str, seconds: float) -> int:
+    """Open and close websockets to the server for `seconds`."""
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        async with websockets.connect(
+            f"ws://127.0.0.1:{SERVER_PORT}", local_addr=(source, 0)
+        ):
+            count += 1
+    return count
+
+
+async def rpcs(
+    test_client: TestCient, key: str, concurrency: int, seconds: float
+) -> int:
+    """Call kv.set for `seconds`, keeping `concurrency` calls in flight."""
+    deadline = time.perf_counter() + seconds
+
+    async def caller(n: int) -> int:
+        count = 0
+        while time.perf_counter() < deadline:
+            await test_client.kv.set(SetInput(k=f"{key}-{n}", v=count), TIMEOUT)
+            count += 1
+        return count
+
+    return sum(await asyncio.gather(*(caller(n) for n in range(concurrency))))
+
+
+async def run_client(
+    client: int, seconds: float, concurrency: int, barrier: Barrier
+) -> tuple[int, int]:
+    source = source_address(client)
+    await asyncio.to_thread(barrier.wait)
+    opened = await connections(source, seconds)
+    relay = Relay(source)
+    relay_port = await relay.start()
+
+    async def get_connection_metadata() -> UriAndMetadata[None]:
+        return {"uri": f"ws://127.0.0.1:{relay_port}", "metadata": None}
+
+    river_client = river.Client(
+        get_connection_metadata,
+        client_id=f"workers-bench-client-{client}",
+        server_id=SERVER_ID,
+        transport_options=TransportOptions(
+            heartbeat_ms=HEARTBEAT_MS, buffer_size=BUFFER_SIZE
+        ),
+    )
+    test_client = TestCient(river_client)
+    try:
+        # Connect before the clock starts.
+        await test_client.kv.set(SetInput(k=source, v=0), TIMEOUT)
+        await asyncio.to_thread(barrier.wait)
+        called = await rpcs(test_client, source, concurrency, seconds)
+        return opened, called
+    finally:
+        await river_client.close()
+        await relay.close()
+
+
+def client_process(
+    client: int,
+    seconds: float,
+    concurrency: int,
+    barrier: Barrier,
+    results: "multiprocessing.Queue[tuple[int, int]]",
+) -> None:
+    # Importing the bench modules configures debug logging for the server.
+    logging.getLogger().setLevel(logging.WARNING)
+    results.put(asyncio.run(run_client(client, seconds, concurrency, barrier)))
+
+
+def wait_for_port(server: subprocess.Popen[bytes], timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", SERVER_PORT), 0.1).close()
+            return
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with {server.returncode}")
+            time.sleep(0.01)
+    raise TimeoutError(f"server did not listen within {timeout}s")
+
+
+def measure(
+    workers: int, clients: int, seconds: float, concurrency: int
+) -> dict[str, float]:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "testservice.server", "--workers", str(workers)],
+        env={
+            **os.environ,
+            "SERVER_TRANSPORT_ID": SERVER_ID,
+            "HEARTBEAT_MS": str(HEARTBEAT_MS),
+        },
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(server, timeout=30)
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(clients)
+        results: multiprocessing.Queue[tuple[int, int]] = context.Queue()
+        processes = [
+            context.Process(
+                target=client_process,
+                args=(client, seconds, concurrency, barrier, results),
+            )
+            for client in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                raise RuntimeError(f"client exited with {process.exitcode}")
+        totals = [results.get() for _ in processes]
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "connections_per_sec": sum(opened for opened, _ in totals) / seconds,
+        "rpc_per_sec": sum(called for _, called in totals) / seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Server throughput as the number of worker processes grows."
+    )
+    parser.add_argument(
+        "--workers",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=[1, 2, 4],
+        help="Comma separated worker counts to measure.",
+    )
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="RPCs in flight per client."
+    )
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "cpus": os.cpu_count(),
+        "clients": args.clients,
+        "concurrency": args.concurrency,
+    }
+    for workers in args.workers:
+        results[f"workers_{workers}"] = measure(
+            workers, args.clients, args.seconds, args.concurrency
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,35 @@
 import asyncio
-import json
 import logging
 import os
 import sys
+import time
+from collections import deque
 from datetime import timedelta
-from typing import AsyncIterator, Dict
+from typing import Any, AsyncIterator, Dict, Optional
 
 from replit_river import (
     Client,
     RiverError,
 )
-from replit_river.error_schema import RiverError  # noqa: F811
+from replit_river.error_schema import (
+    RiverError,  # noqa: F811
+    RiverServiceException,
+)
 from replit_river.transport_options import TransportOptions, UriAndMetadata
 
+from testservice import logs, loop, shutdown
+from testservice.dispatch import RpcDispatcher
+from testservice.latency import LatencyRecorder
+from testservice.profiling import diagnostics
 from testservice.protos import TestCient
+from testservice.protos.kv.mget import MgetInput
+from testservice.protos.kv.mset import MsetInput, MsetInputEntries
 from testservice.protos.kv.set import SetInput
 from testservice.protos.kv.watch import WatchInput, WatchOutput
-from testservice.protos.repeat.echo import EchoInput, EchoOutput
-from testservice.protos.upload.send import SendInput, SendOutput
+from testservice.protos.kv.watch_prefix import Watch_PrefixInput, Watch_PrefixOutput
+from testservice.ready import log_time_to_ready
+from testservice.response_writer import ResponseWriter
+from testservice.stdin_reader import StdinReader
 
 # TODO: note:numbers
 # Unfortunately we've got to work around a difference in interpretation between node
@@ -39,16 +51,35 @@ HEARTBEAT_MS = int(os.getenv("HEARTBEAT_MS", "500"))
 HEARTBEATS_UNTIL_DEAD = int(os.getenv("HEARTBEATS_UNTIL_DEAD", "2"))
 SESSION_DISCONNECT_GRACE_MS = int(os.getenv("SESSION_DISCONNECT_GRACE_MS", "3000"))
 RIVER_SERVER = os.getenv("RIVER_SERVER")
-
-
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="Python Server %(asctime)s - %(levelname)s - %(message)s",
-)
+# Max number of kv.set RPCs in flight at once. 1 awaits each call before reading the
+# next command. Pipelining is opt-in: the node clients await every call, and the
+# tests' expected output, such as the order of set responses and watch updates or
+# which sets fail across a disconnect, assumes each kv.set is answered before the
+# next command is sent.
+KV_SET_WINDOW = int(os.getenv("KV_SET_WINDOW", "1"))
+# Emit kv.set results in issue order rather than completion order.
+KV_SET_ORDERED = os.getenv("KV_SET_ORDERED", "0") == "1"
+# Batching limits for response lines written to stdout.
+RESPONSE_FLUSH_BYTES = int(os.getenv("RESPONSE_FLUSH_BYTES", str(64 * 1024)))
+RESPONSE_FLUSH_MS = float(os.getenv("RESPONSE_FLUSH_MS", "2"))
+# Validate every message from the server with pydantic rather than trusting it.
+RIVER_STRICT_VALIDATION = os.getenv("RIVER_STRICT_VALIDATION", "0") == "1"
+# Also write the per-procedure latency summary to this file, as JSON.
+CLIENT_LATENCY_FILE = os.getenv("CLIENT_LATENCY_FILE")
+
+
+logs.configure()
 
 
 input_streams: Dict[str, asyncio.Queue] = {}
 tasks: Dict[str, asyncio.Task] = {}
+responses = ResponseWriter(
+    max_bytes=RESPONSE_FLUSH_BYTES, max_delay=RESPONSE_FLUSH_MS / 1000
+)
+latencies = LatencyRecorder()
+# Written when the commands run out, or on SIGTERM, which is how the driver usually
+# stops the client.
+report_latencies = shutdown.register(lambda: latencies.report(path=CLIENT_LATENCY_FILE))
 
 
 async def process_commands() -> None:
@@ -79,50 +110,62 @@ async def process_commands() -> None:
             session_disconnect_grace_ms=SESSION_DISCONNECT_GRACE_MS,
         ),
     )
-    test_client = TestCient(client)
+    test_client = TestCient(client, strict=RIVER_STRICT_VALIDATION)
+    dispatcher = RpcDispatcher(
+        responses.write, window=KV_SET_WINDOW, ordered=KV_SET_ORDERED
+    )
+    reader = StdinReader()
+    responses.idle = reader.actions.empty
+    reader.start()
+    log_time_to_ready("client")
     try:
         while True:
-            line = await asyncio.get_event_loop().run_in_executor(
-                None, sys.stdin.readline
-            )
-            if not line:
+            if reader.actions.empty():
+                # The driver may be waiting on a response before sending more.
+                responses.flush()
+            action = await reader.actions.get()
+            if action is None:
                 break
-
-            try:
-                action = json.loads(line)
-            except json.JSONDecodeError as e:
-                # Sometimes docker injects this into the stream:
-                # {"hijack":true,"stream":true,"stdin":true,"stdout":true,"stderr":true}{"type": "invoke", ...  # noqa: E501
-                offset = e.colno - 1
-                first = json.loads(line[0:offset])
-                assert "hijack" in first
-                action = json.loads(line[offset:])
+            if isinstance(action, Exception):
+                # Fail after the commands read before the bad one, as they would
+                # have been answered had it been read line by line.
+                await dispatcher.drain()
+                raise action
 
             if not action:
-                print("FATAL: invalid command", line)
+                responses.flush()
+                print("FATAL: invalid command", action)
                 sys.exit(1)
 
             # Extract the named groups
             id_ = action["id"]
             payload = action.get("payload")
 
+            proc = action["proc"]
+            if proc != "kv.set":
+                # Keep other procedures ordered relative to pipelined kv.set calls.
+                await dispatcher.drain()
+
             # Example handling for a 'kv.set' command
-            match action["proc"]:
+            match proc:
                 case "kv.set":
                     k = payload["k"]
                     v = payload["v"]
-                    try:
-                        res = await test_client.kv.set(
-                            SetInput(k=k, v=int(v)), timedelta(seconds=60)
-                        )  # noqa: E501
-                        print(
-                            f"{id_} -- ok:{res.v:.0f}"
-                        )  # TODO: See `note:numbers` above
-                    except Exception:
-                        print(f"{id_} -- err:UNEXPECTED_DISCONNECT")
+                    await dispatcher.submit(handle_set(id_, k, v, test_client))
                 case "kv.watch":
                     k = payload["k"]
                     tasks[id_] = asyncio.create_task(handle_watch(id_, k, test_client))
+                case "kv.mset":
+                    entries = payload["entries"]
+                    responses.write(await handle_mset(id_, entries, test_client))
+                case "kv.mget":
+                    ks = payload["ks"]
+                    responses.write(await handle_mget(id_, ks, test_client))
+                case "kv.watch_prefix":
+                    prefix = payload["prefix"]
+                    tasks[id_] = asyncio.create_task(
+                        handle_watch_prefix(id_, prefix, test_client)
+                    )
                 case "repeat.echo":
                     if id_ not in input_streams:
                         input_streams[id_] = asyncio.Queue()
@@ -149,77 +192,168 @@ async def process_commands() -> None:
                             await tasks[id_]
                             tasks.pop(id_, None)  # Cleanup task reference
                             input_streams.pop(id_, None)  # Cleanup queue reference
+        await dispatcher.drain()
     finally:
+        reader.stop()
+        dispatcher.cancel()
         await client.close()
+        responses.flush()
+        report_latencies()
         for task in tasks.values():
             task.cancel()
             exception = task.exception()
             if exception is not None:
-                logging.error("Task raised an exception: {}", exception)
+                logging.error("Task raised an exception: %s", exception)
         tasks.clear()
 
 
+async def handle_set(id_: str, k: str, v: float, test_client: TestCient) -> str:
+    started = time.perf_counter()
+    try:
+        res = await test_client.kv.set(SetInput(k=k, v=int(v)), timedelta(seconds=60))
+        return f"{id_} -- ok:{res.v:.0f}"  # TODO: See `note:numbers` above
+    except Exception:
+        return f"{id_} -- err:UNEXPECTED_DISCONNECT"
+    finally:
+        latencies.record("kv.set", id_, time.perf_counter() - started)
+
+
 async def handle_watch(
     id_: str,
     k: str,
     test_client: TestCient,
 ) -> None:
+    # Only the first update answers the subscription itself; later ones follow
+    # other invocations' sets.
+    started: Optional[float] = time.perf_counter()
     try:
         async for v in await test_client.kv.watch(WatchInput(k=k)):
+            if started is not None:
+                latencies.record("kv.watch", id_, time.perf_counter() - started)
+                started = None
             if isinstance(v, WatchOutput):
-                print(f"{id_} -- ok:{v.v:.0f}")  # TODO: See `note:numbers` above
+                # TODO: See `note:numbers` above
+                responses.write(f"{id_} -- ok:{v.v:.0f}")
+            else:
+                responses.write(f"{id_} -- err:{v.code}")
+    except Exception:
+        responses.write(f"{id_} -- err:UNEXPECTED_DISCONNECT")
+
+
+async def handle_mset(
+    id_: str, entries: list[dict[str, Any]], test_client: TestCient
+) -> str:
+    started = time.perf_counter()
+    try:
+        res = await test_client.kv.mset(
+            MsetInput(entries=[MsetInputEntries(k=e["k"], v=e["v"]) for e in entries]),
+            timedelta(seconds=60),
+        )
+        # TODO: See `note:numbers` above
+        return f"{id_} -- ok:{','.join(f'{v:.0f}' for v in res.vs)}"
+    except Exception:
+        return f"{id_} -- err:UNEXPECTED_DISCONNECT"
+    finally:
+        latencies.record("kv.mset", id_, time.perf_counter() - started)
+
+
+async def handle_mget(id_: str, ks: list[str], test_client: TestCient) -> str:
+    started = time.perf_counter()
+    try:
+        res = await test_client.kv.mget(MgetInput(ks=ks), timedelta(seconds=60))
+        # TODO: See `note:numbers` above
+        return f"{id_} -- ok:{','.join(f'{v:.0f}' for v in res.vs)}"
+    except RiverServiceException as e:
+        return f"{id_} -- err:{e.code}"
+    except Exception:
+        return f"{id_} -- err:UNEXPECTED_DISCONNECT"
+    finally:
+        latencies.record("kv.mget", id_, time.perf_counter() - started)
+
+
+async def handle_watch_prefix(id_: str, prefix: str, test_client: TestCient) -> None:
+    # Each frame is printed as one line of k=v pairs, in the order they were sent.
+    try:
+        async for frame in await test_client.kv.watch_prefix(
+            Watch_PrefixInput(prefix=prefix)
+        ):
+            if isinstance(frame, Watch_PrefixOutput):
+                # TODO: See `note:numbers` above
+                changes = ",".join(f"{c.k}={c.v:.0f}" for c in frame.changes)
+                responses.write(f"{id_} -- ok:{changes}")
             else:
-                print(f"{id_} -- err:{v.code}")
+                responses.write(f"{id_} -- err:{frame.code}")
     except Exception:
-        print(f"{id_} -- err:UNEXPECTED_DISCONNECT")
+        responses.write(f"{id_} -- err:UNEXPECTED_DISCONNECT")
 
 
 async def handle_upload(id_: str, test_client: TestCient) -> None:
+    # Imported per stream so runs that never upload don't load the service.
+    from testservice.protos.upload.send import SendInput, SendOutput
+
+    # The document is the response to the last part, so time from EOF.
+    eof_sent = 0.0
+
     async def upload_iterator() -> AsyncIterator[SendInput]:
+        nonlocal eof_sent
         while True:
             item = await input_streams[id_].get()
             if item == "EOF":  # Use a special EOF marker to break the loop
+                eof_sent = time.perf_counter()
                 break
             yield SendInput(part=item)
 
     async def print_result(result: SendOutput | RiverError) -> None:
         if isinstance(result, SendOutput):
-            print(f"{id_} -- ok:{result.doc}")
+            responses.write(f"{id_} -- ok:{result.doc}")
         else:  # Assuming this handles both RiverError and exceptions
-            print(f"{id_} -- err:UNEXPECTED_DISCONNECT")
+            responses.write(f"{id_} -- err:UNEXPECTED_DISCONNECT")
         return
 
     try:
         result = await test_client.upload.send(upload_iterator())
+        if eof_sent:
+            latencies.record("upload.send", id_, time.perf_counter() - eof_sent)
         await print_result(result)
     except Exception:
-        print(f"{id_} -- err:UNEXPECTED_DISCONNECT")
+        responses.write(f"{id_} -- err:UNEXPECTED_DISCONNECT")
 
 
 async def handle_echo(id_: str, test_client: TestCient) -> None:
+    from testservice.protos.repeat.echo import EchoInput, EchoOutput
+
+    # Issue times of the messages not yet echoed back, oldest first.
+    sent: deque[float] = deque()
+
     async def upload_iterator() -> AsyncIterator[EchoInput]:
         while True:
             item = await input_streams[id_].get()
             if item == "EOF":  # Use a special EOF marker to break the loop
                 break
+            sent.append(time.perf_counter())
             yield EchoInput(str=item)
 
     def print_result(result: EchoOutput | RiverError) -> None:
         if isinstance(result, EchoOutput):
-            print(f"{id_} -- ok:{result.out}")
+            responses.write(f"{id_} -- ok:{result.out}")
         else:  # Assuming this handles both RiverError and exceptions
-            print(f"{id_} -- err:{result.code}")
+            responses.write(f"{id_} -- err:{result.code}")
 
     try:
         async for v in await test_client.repeat.echo(upload_iterator()):
+            if sent:
+                latencies.record(
+                    "repeat.echo", id_, time.perf_counter() - sent.popleft()
+                )
             print_result(v)
     except Exception:
-        print(f"{id_} -- err:UNEXPECTED_DISCONNECT")
+        responses.write(f"{id_} -- err:UNEXPECTED_DISCONNECT")
 
 
 async def main() -> None:
-    await process_commands()
+    with diagnostics("client"):
+        await process_commands()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    loop.run(main())
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class RpcDispatcher:
+    """Runs RPC invocations as their own tasks, bounded by a max-in-flight window.
+
+    Each submitted invocation resolves to the output line for its own id, so results
+    are correct per id regardless of completion order. With `ordered=True` lines are
+    emitted in issue order instead of completion order.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        window: int = 1,
+        ordered: bool = False,
+    ) -> None:
+        assert window >= 1, "window must be at least 1"
+        self._emit = emit
+        self._ordered = ordered
+        self._slots = asyncio.Semaphore(window)
+        self._pending: set[asyncio.Task[None]] = set()
+        # Completion of the most recently issued invocation, used to chain emits
+        # when preserving issue order.
+        self._tail: Optional[asyncio.Future[None]] = None
+
+    async def submit(self, invocation: Awaitable[str]) -> None:
+        """Schedule `invocation`, waiting for a free slot if the window is full."""
+        await self._slots.acquire()
+        previous = self._tail
+        done: Optional[asyncio.Future[None]] = None
+        if self._ordered:
+            done = asyncio.get_running_loop().create_future()
+            self._tail = done
+        task = asyncio.create_task(self._run(invocation, previous, done))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run(
+        self,
+        invocation: Awaitable[str],
+        previous: Optional[asyncio.Future[None]],
+        done: Optional[asyncio.Future[None]],
+    ) -> None:
+        try:
+            line = await invocation
+            if previous is not None:
+                await previous
+            self._emit(line)
+        finally:
+            if done is not None and not done.done():
+                done.set_result(None)
+            self._slots.release()
+
+    async def drain(self) -> None:
+        """Wait for every in-flight invocation to emit its result."""
+        while self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def cancel(self) -> None:
+        for task in self._pending:
+            task.cancel()
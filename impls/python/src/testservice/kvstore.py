@@ -0,0 +1,219 @@
+import asyncio
+from array import array
+from bisect import bisect_left
+from typing import Callable, Generic, Iterable, Iterator, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Resolves once a subscriber has forwarded an update.
+Delivery = asyncio.Future[None]
+# Called with a key's new value. May return a `Delivery` for the setter to wait on.
+Listener = Callable[[T], Optional[Delivery]]
+# Called with (key, value) for each set of a key under a watched prefix.
+PrefixListener = Callable[[str, float], None]
+
+
+def resolve(waiter: Optional[asyncio.Future[None]]) -> None:
+    if waiter is not None and not waiter.done():
+        waiter.set_result(None)
+
+
+class Observable(Generic[T]):
+    __slots__ = ("value", "listeners")
+
+    value: T
+
+    def __init__(self, initial_value: T):
+        self.value = initial_value
+        # Listeners must not block: they hand the value off (e.g. into a subscriber
+        # queue) so one slow subscriber can't hold up the others or the setter. A
+        # listener may return a `Delivery` for the setter to wait on. A dict keeps
+        # insertion order and makes unsubscribing O(1).
+        self.listeners: dict[Listener[T], None] = {}
+
+    def get(self) -> T:
+        return self.value
+
+    def set(self, value: T) -> list[Delivery]:
+        """Store `value` and hand it to every listener, returning their deliveries."""
+        new_value = value
+        self.value = new_value
+        pending: list[Delivery] = []
+        for listener in self.listeners:
+            delivery = listener(new_value)
+            if delivery is not None:
+                pending.append(delivery)
+        return pending
+
+    def observe(self, listener: Listener[T]) -> Callable[[], None]:
+        self.listeners[listener] = None
+        listener(self.get())  # Initial call for the current value
+        return lambda: self.listeners.pop(listener, None)
+
+
+class KvShard:
+    __slots__ = ("slots", "values", "observers")
+
+    def __init__(self) -> None:
+        # key -> index into `values`
+        self.slots: dict[str, int] = {}
+        self.values = array("d")
+        # Only keys that are currently watched have an Observable, keyed by slot.
+        self.observers: dict[int, Observable[float]] = {}
+
+
+class KvStore:
+    """Float key-value store that keeps values unboxed in per-shard arrays.
+
+    Keys are spread over `shards` independent dicts so no single resize has to
+    rehash the whole keyspace.
+
+    Prefix listeners are indexed by prefix, so routing a set to them costs one lookup
+    per distinct prefix length rather than a pass over every watched key. The sorted
+    key index used to answer prefix queries is only built once the first query comes
+    in; after that, new keys are merged into it lazily on the next query.
+    """
+
+    __slots__ = ("_shards", "_prefix_listeners", "_prefix_lengths", "_sorted", "_new")
+
+    def __init__(self, shards: int = 16) -> None:
+        self._shards = tuple(KvShard() for _ in range(shards))
+        self._prefix_listeners: dict[str, dict[PrefixListener, None]] = {}
+        # prefix length -> number of prefixes of that length with listeners
+        self._prefix_lengths: dict[int, int] = {}
+        self._sorted: Optional[list[str]] = None
+        self._new: list[str] = []
+
+    def _shard(self, key: str) -> KvShard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shard(key).slots
+
+    def __len__(self) -> int:
+        return sum(len(shard.slots) for shard in self._shards)
+
+    def items(self) -> Iterator[tuple[str, float]]:
+        for shard in self._shards:
+            values = shard.values
+            for key, slot in shard.slots.items():
+                yield key, values[slot]
+
+    def copy_shards(self) -> list[tuple[dict[str, int], Sequence[float]]]:
+        """Copies of each shard's key slots and values, which later sets leave alone.
+
+        Cheap enough to take on the event loop, and safe to read from another thread.
+        """
+        return [(shard.slots.copy(), shard.values[:]) for shard in self._shards]
+
+    def get(self, key: str) -> float:
+        shard = self._shard(key)
+        return shard.values[shard.slots[key]]
+
+    def keys_with_prefix(self, prefix: str) -> list[str]:
+        """Existing keys starting with `prefix`, in sorted order."""
+        if self._sorted is None:
+            self._sorted = sorted(key for shard in self._shards for key in shard.slots)
+        elif self._new:
+            # The index and the new keys are each one run, which sort() merges.
+            self._new.sort()
+            self._sorted += self._new
+            self._sorted.sort()
+            self._new.clear()
+        keys = self._sorted
+        start = end = bisect_left(keys, prefix)
+        while end < len(keys) and keys[end].startswith(prefix):
+            end += 1
+        return keys[start:end]
+
+    def _add(self, shard: KvShard, key: str, value: float) -> None:
+        shard.slots[key] = len(shard.values)
+        shard.values.append(value)
+        if self._sorted is not None:
+            self._new.append(key)
+
+    def set(self, key: str, value: float) -> list[Delivery]:
+        """Store `value`, returning deliveries for any watchers of `key`."""
+        shard = self._shard(key)
+        slot = shard.slots.get(key)
+        pending: list[Delivery] = []
+        if slot is None:
+            self._add(shard, key, value)
+        else:
+            shard.values[slot] = value
+            observable = shard.observers.get(slot)
+            if observable is not None:
+                pending = observable.set(value)
+        if self._prefix_lengths:
+            self._notify_prefixes(key, value)
+        return pending
+
+    def set_many(self, entries: Iterable[tuple[str, float]]) -> list[Delivery]:
+        """Store all entries, then notify each watched key once with its last value,
+        returning deliveries for their watchers."""
+        changed: dict[Observable[float], float] = {}
+        for key, value in entries:
+            shard = self._shard(key)
+            slot = shard.slots.get(key)
+            if slot is None:
+                self._add(shard, key, value)
+            else:
+                shard.values[slot] = value
+                observable = shard.observers.get(slot)
+                if observable is not None:
+                    changed[observable] = value
+            if self._prefix_lengths:
+                self._notify_prefixes(key, value)
+        pending: list[Delivery] = []
+        for observable, value in changed.items():
+            pending += observable.set(value)
+        return pending
+
+    def _notify_prefixes(self, key: str, value: float) -> None:
+        for length in self._prefix_lengths:
+            listeners = self._prefix_listeners.get(key[:length])
+            if listeners is None:
+                continue
+            for listener in listeners:
+                listener(key, value)
+
+    def observe(self, key: str, listener: Listener[float]) -> Callable[[], None]:
+        """Subscribe `listener` to `key`, which must already exist."""
+        shard = self._shard(key)
+        slot = shard.slots[key]
+        observable = shard.observers.get(slot)
+        if observable is None:
+            observable = shard.observers[slot] = Observable(shard.values[slot])
+        stop = observable.observe(listener)
+
+        def unsubscribe() -> None:
+            stop()
+            if not observable.listeners and shard.observers.get(slot) is observable:
+                del shard.observers[slot]
+
+        return unsubscribe
+
+    def observe_prefix(
+        self, prefix: str, listener: PrefixListener
+    ) -> Callable[[], None]:
+        """Subscribe `listener` to every set of a key starting with `prefix`.
+
+        Unlike `observe`, the listener is not called for the current values.
+        """
+        listeners = self._prefix_listeners.get(prefix)
+        if listeners is None:
+            listeners = self._prefix_listeners[prefix] = {}
+            length = len(prefix)
+            self._prefix_lengths[length] = self._prefix_lengths.get(length, 0) + 1
+        listeners[listener] = None
+
+        def unsubscribe() -> None:
+            listeners.pop(listener, None)
+            if not listeners and self._prefix_listeners.get(prefix) is listeners:
+                del self._prefix_listeners[prefix]
+                length = len(prefix)
+                self._prefix_lengths[length] -= 1
+                if not self._prefix_lengths[length]:
+                    del self._prefix_lengths[length]
+
+        return unsubscribe
@@ -0,0 +1,129 @@
+"""Client-side latency histograms, per procedure, in fixed memory.
+
+Values are recorded in whole microseconds into HDR-style log buckets: every value
+below `SUB_BUCKETS` gets its own bucket, and each power of two above that is split
+into `SUB_BUCKETS // 2` linear buckets. A reported percentile is the highest value
+its bucket can hold, at most 1/64th above the recorded one.
+"""
+
+import heapq
+import json
+import math
+import sys
+from typing import Any, Optional
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF = SUB_BUCKETS // 2
+# Values above this, about 67s, are counted in the last bucket. `max` stays exact.
+MAX_US = (1 << 26) - 1
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+# Slowest invocations remembered per procedure.
+SLOWEST = 5
+
+
+def bucket_index(us: int) -> int:
+    if us < SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF + (us >> shift) - HALF
+
+
+def bucket_upper(index: int) -> int:
+    """The highest value, in microseconds, that lands in bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift, offset = divmod(index - SUB_BUCKETS, HALF)
+    return ((offset + HALF + 1) << (shift + 1)) - 1
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (bucket_index(MAX_US) + 1)
+        self.count = 0
+        self.total_us = 0
+        self.min_us = MAX_US
+        self.max_us = 0
+
+    def record(self, us: int) -> None:
+        self.counts[bucket_index(min(us, MAX_US))] += 1
+        self.count += 1
+        self.total_us += us
+        if us < self.min_us:
+            self.min_us = us
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, p: float) -> int:
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper(index), self.max_us)
+        return self.max_us
+
+
+class LatencyRecorder:
+    """Time from issuing an invocation to its response, for each procedure.
+
+    Besides the histogram, the few slowest invocation ids of each procedure are kept,
+    so a slow percentile can be traced back to the driver's commands.
+    """
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, Histogram] = {}
+        # Min-heaps of (us, id).
+        self.slowest: dict[str, list[tuple[int, str]]] = {}
+
+    def record(self, proc: str, id_: str, seconds: float) -> None:
+        us = int(seconds * 1e6)
+        histogram = self.histograms.get(proc)
+        if histogram is None:
+            histogram = self.histograms[proc] = Histogram()
+            self.slowest[proc] = []
+        histogram.record(us)
+        slowest = self.slowest[proc]
+        if len(slowest) < SLOWEST:
+            heapq.heappush(slowest, (us, id_))
+        elif us > slowest[0][0]:
+            heapq.heapreplace(slowest, (us, id_))
+
+    def summary(self) -> dict[str, Any]:
+        """Percentiles in milliseconds, and the slowest ids, for each procedure."""
+        summary: dict[str, Any] = {}
+        for proc, histogram in sorted(self.histograms.items()):
+            summary[proc] = {
+                "count": histogram.count,
+                "min_ms": histogram.min_us / 1000,
+                "mean_ms": histogram.total_us / histogram.count / 1000,
+                **{f"p{p:g}_ms": histogram.percentile(p) / 1000 for p in PERCENTILES},
+                "max_ms": histogram.max_us / 1000,
+                "slowest": [
+                    {"id": id_, "ms": us / 1000}
+                    for us, id_ in sorted(self.slowest[proc], reverse=True)
+                ],
+            }
+        return summary
+
+    def report(self, path: Optional[str] = None) -> None:
+        """Write one summary line per procedure to stderr, and the full summary as
+        JSON to `path` if given."""
+        summary = self.summary()
+        for proc, stats in summary.items():
+            percentiles = " ".join(
+                f"p{p:g}={stats[f'p{p:g}_ms']:.3f}ms" for p in PERCENTILES
+            )
+            slowest = ", ".join(f"{s['id']} {s['ms']:.3f}ms" for s in stats["slowest"])
+            print(
+                f"latency {proc}: n={stats['count']} {percentiles} "
+                f"max={stats['max_ms']:.3f}ms slowest: {slowest}",
+                file=sys.stderr,
+                flush=True,
+            )
+        if path:
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+                f.write("\n")
@@ -0,0 +1,81 @@
+"""Logging for the client and server, formatted and written off the event loop.
+
+Records go through a queue to a `QueueListener` thread, unformatted, so even the
+%-style arguments of river's per-message debug records are only rendered there.
+Those arguments are messages that are no longer modified once they are logged.
+
+The client and server are stopped with SIGTERM, which skips `logging.shutdown`, so
+`configure` registers it as a `shutdown` hook, the first one: hooks run newest first,
+so the records the other hooks log are written out too.
+"""
+
+import logging
+import os
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional, TextIO
+
+from testservice import shutdown
+
+# Level of the root logger, by name.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+FORMAT = "Python Server %(asctime)s - %(levelname)s - %(message)s"
+
+
+class BackgroundHandler(QueueHandler):
+    """Hands records to a thread that formats them and passes them to `handler`.
+
+    The thread is stopped before `os.fork`, so it holds no locks across the fork, and
+    started again in both processes. Closing the handler, as `logging.shutdown` does
+    at exit, writes out whatever is still queued.
+    """
+
+    def __init__(self, handler: logging.Handler) -> None:
+        super().__init__(SimpleQueue())
+        self._listener = QueueListener(self.queue, handler)
+        self._running = False
+        self._closed = False
+        self._start()
+        os.register_at_fork(
+            before=self._stop,
+            after_in_parent=self._start,
+            after_in_child=self._start,
+        )
+
+    def _start(self) -> None:
+        if not self._running and not self._closed:
+            self._listener.start()
+            self._running = True
+
+    def _stop(self) -> None:
+        if self._running:
+            self._listener.stop()
+            self._running = False
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def close(self) -> None:
+        self._stop()
+        self._closed = True
+        super().close()
+
+
+def configure(
+    stream: Optional[TextIO] = None, level: str | int = LOG_LEVEL
+) -> BackgroundHandler:
+    """Write the root logger's records to `stream`, stderr by default, from a
+    background thread, and flush them on SIGTERM unless something else handles it.
+    Returns the existing handler if there already is one."""
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, BackgroundHandler):
+            return handler
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(logging.Formatter(FORMAT))
+    handler = BackgroundHandler(writer)
+    root.addHandler(handler)
+    root.setLevel(level)
+    shutdown.register(logging.shutdown)
+    shutdown.install()
+    return handler
@@ -0,0 +1,35 @@
+"""The event loop the client and server run on."""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+# "asyncio", the default, or "uvloop", which falls back to asyncio's own loop when
+# uvloop isn't installed (it comes with the uvloop extra).
+RIVER_LOOP = os.getenv("RIVER_LOOP", "asyncio")
+assert RIVER_LOOP in ("uvloop", "asyncio"), RIVER_LOOP
+
+T = TypeVar("T")
+
+
+def loop_factory(
+    name: str = RIVER_LOOP,
+) -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """A factory for the loop called `name`, or None for asyncio's default loop."""
+    if name != "uvloop":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        logging.warning("uvloop is not installed, running on asyncio's loop")
+        return None
+    return uvloop.new_event_loop
+
+
+def run(main: Coroutine[Any, Any, T], name: str = RIVER_LOOP) -> T:
+    """Like `asyncio.run`, on the loop picked by `name`."""
+    factory = loop_factory(name)
+    with asyncio.Runner(loop_factory=factory) as runner:
+        logging.info("running on %s", type(runner.get_loop()).__module__)
+        return runner.run(main)
@@ -0,0 +1,196 @@
+"""Per-procedure counters and latency histograms, in Prometheus text format.
+
+Servicers are wrapped with `Metrics.instrument` before they are registered through
+`service_river.add_*Servicer_to_server`. Each call then updates its procedure's
+counters in place; nothing is formatted until `/metrics` is scraped.
+"""
+
+import inspect
+import time
+from bisect import bisect_left
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Iterable, TypeVar, cast
+
+from replit_river.error_schema import RiverError
+
+# Upper bounds, in seconds, of the handler latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+S = TypeVar("S")
+
+# Name, type, help, and (labels, value) samples of a metric family.
+MetricFamily = tuple[str, str, str, Iterable[tuple[str, float]]]
+# Reads metric families at scrape time.
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class ProcedureStats:
+    """Counters for one (service, procedure)."""
+
+    __slots__ = ("calls", "errors", "in_flight", "messages", "buckets", "seconds")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.messages = 0
+        # One count per bucket, plus one for latencies above the last bound.
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.seconds = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.seconds += seconds
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.procedures: dict[tuple[str, str], ProcedureStats] = {}
+        self.collectors: list[Collector] = []
+
+    def instrument(self, service: str, servicer: S) -> S:
+        """Wrap each public method of `servicer` to count its calls.
+
+        Returns a stand-in to register in place of `servicer`. Request iterators are
+        passed through untouched, so handlers still see river's channel.
+        """
+        return cast(S, _Instrumented(self, service, servicer))
+
+    def collect(self, collector: Collector) -> None:
+        """Read more metric families from `collector` on every scrape."""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help: str) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        procedures = sorted(self.procedures.items())
+        counters = (
+            ("calls_total", "counter", "Calls started.", "calls"),
+            (
+                "errors_total",
+                "counter",
+                "Calls that raised or returned an error.",
+                "errors",
+            ),
+            ("in_flight", "gauge", "Calls still running.", "in_flight"),
+            ("messages_total", "counter", "Messages sent by streams.", "messages"),
+        )
+        for suffix, kind, help, attr in counters:
+            name = f"testservice_procedure_{suffix}"
+            family(name, kind, help)
+            for (service, procedure), stats in procedures:
+                labels = f'service="{service}",procedure="{procedure}"'
+                lines.append(f"{name}{{{labels}}} {getattr(stats, attr)}")
+
+        name = "testservice_procedure_latency_seconds"
+        family(name, "histogram", "Time rpc and upload handlers took to respond.")
+        for (service, procedure), stats in procedures:
+            labels = f'service="{service}",procedure="{procedure}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += stats.buckets[-1]
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {stats.seconds}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+        for collector in self.collectors:
+            for name, kind, help, samples in collector():
+                family(name, kind, help)
+                for labels, value in samples:
+                    lines.append(
+                        f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+class _Instrumented:
+    def __init__(self, metrics: Metrics, service: str, servicer: Any) -> None:
+        self._metrics = metrics
+        self._service = service
+        self._servicer = servicer
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._servicer, name)
+        if name.startswith("_") or not callable(method):
+            return method
+        stats = self._metrics.procedures.setdefault(
+            (self._service, name), ProcedureStats()
+        )
+        wrapped = (
+            _stream(method, stats)
+            if inspect.isasyncgenfunction(method)
+            else _call(method, stats)
+        )
+        # Cache it so later lookups skip __getattr__.
+        setattr(self, name, wrapped)
+        return wrapped
+
+
+def _call(method: Callable[..., Any], stats: ProcedureStats) -> Callable[..., Any]:
+    async def wrapped(request: Any, context: Any) -> Any:
+        stats.calls += 1
+        stats.in_flight += 1
+        started = time.perf_counter()
+        try:
+            response = await method(request, context)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.observe(time.perf_counter() - started)
+        # isinstance goes through pydantic's metaclass and costs over a microsecond.
+        if type(response) is RiverError:
+            stats.errors += 1
+        return response
+
+    wrapped.__name__ = method.__name__
+    return wrapped
+
+
+def _stream(
+    method: Callable[..., AsyncGenerator[Any, None]], stats: ProcedureStats
+) -> Callable[..., AsyncIterator[Any]]:
+    async def wrapped(request: Any, context: Any) -> AsyncIterator[Any]:
+        stats.calls += 1
+        stats.in_flight += 1
+        try:
+            # Close the handler along with this wrapper, not whenever it is collected.
+            async with aclosing(method(request, context)) as responses:
+                async for response in responses:
+                    if type(response) is RiverError:
+                        stats.errors += 1
+                    else:
+                        stats.messages += 1
+                    yield response
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    wrapped.__name__ = method.__name__
+    return wrapped
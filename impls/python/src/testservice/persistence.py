@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+from typing import IO, Iterable, Iterator, Optional, Sequence
+
+from testservice.kvstore import KvStore
+
+# Each record is a (key length, value) header followed by the UTF-8 encoded key.
+RECORD_HEADER = struct.Struct("<Id")
+# A snapshot starts with a magic and the generation of the first log after it.
+SNAPSHOT_HEADER = struct.Struct("<4sQ")
+SNAPSHOT_MAGIC = b"RVKV"
+SNAPSHOT_NAME = "snapshot"
+LOG_PREFIX = "wal."
+
+
+def encode_record(key: str, value: float) -> bytes:
+    encoded = key.encode()
+    return RECORD_HEADER.pack(len(encoded), value) + encoded
+
+
+def complete_length(data: mmap.mmap) -> int:
+    """Length of the prefix of `data` that holds only complete records."""
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        key_len, _ = RECORD_HEADER.unpack_from(data, offset)
+        if offset + RECORD_HEADER.size + key_len > len(data):
+            break
+        offset += RECORD_HEADER.size + key_len
+    return offset
+
+
+def iter_records(data: mmap.mmap, offset: int = 0) -> Iterator[tuple[str, float]]:
+    """Decode records from `data`, stopping at a truncated trailing record."""
+    end = len(data)
+    while offset + RECORD_HEADER.size <= end:
+        key_len, value = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + key_len > end:
+            break
+        yield str(data[offset : offset + key_len], "utf-8"), value
+        offset += key_len
+
+
+def read_mapped(path: str, offset: int = 0) -> Iterator[tuple[str, float]]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= offset:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_records(data, offset)
+
+
+class KvLog:
+    """Append-only write-ahead log of kv.set operations, with periodic snapshots.
+
+    Records are written and fsynced in groups: everything appended while one group is
+    being synced goes out with the next. After `snapshot_every` records the store is
+    compacted into a snapshot, later records go to a new log generation, and logs
+    covered by the snapshot are removed. Snapshots are encoded and written in a thread
+    while group commits go on in the new log.
+
+    Callers apply a set to the store only once its record is on disk.
+    """
+
+    def __init__(
+        self,
+        store: KvStore,
+        directory: str,
+        snapshot_every: int = 100_000,
+        group_delay: float = 0.0,
+    ) -> None:
+        self.store = store
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.group_delay = group_delay
+        self._generation = 0
+        self._file: Optional[IO[bytes]] = None
+        self._pending = bytearray()
+        self._commit: Optional[asyncio.Future[None]] = None
+        self._since_snapshot = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._snapshotting: Optional[asyncio.Task[None]] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _log_generations(self) -> list[int]:
+        return sorted(
+            int(name.removeprefix(LOG_PREFIX))
+            for name in os.listdir(self.directory)
+            if name.startswith(LOG_PREFIX)
+        )
+
+    def load(self) -> int:
+        """Replay the snapshot and the logs after it into the store.
+
+        Returns the number of records replayed.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        replayed = 0
+        snapshot = self._path(SNAPSHOT_NAME)
+        if os.path.exists(snapshot):
+            with open(snapshot, "rb") as f:
+                magic, self._generation = SNAPSHOT_HEADER.unpack(
+                    f.read(SNAPSHOT_HEADER.size)
+                )
+            assert magic == SNAPSHOT_MAGIC, f"{snapshot} is not a kv snapshot"
+            for key, value in read_mapped(snapshot, SNAPSHOT_HEADER.size):
+                self.store.set(key, value)
+                replayed += 1
+        for generation in self._log_generations():
+            path = self._path(f"{LOG_PREFIX}{generation}")
+            if generation < self._generation:
+                os.remove(path)
+                continue
+            for key, value in read_mapped(path):
+                self.store.set(key, value)
+                replayed += 1
+                self._since_snapshot += 1
+            self._generation = generation
+        path = self._path(f"{LOG_PREFIX}{self._generation}")
+        self._file = open(path, "a+b")
+        if self._file.tell():
+            # Drop a record that was only partially written before a crash, so new
+            # records don't land after it.
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                self._file.truncate(complete_length(data))
+        return replayed
+
+    def start(self) -> None:
+        assert self._file is not None, "load() must be called before start()"
+        self._task = asyncio.create_task(self._sync_loop())
+
+    async def close(self) -> None:
+        """Wait for everything appended so far to be synced, then stop."""
+        while self._commit is not None:
+            await self._commit
+        if self._snapshotting is not None:
+            await asyncio.wait([self._snapshotting])
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(self, key: str, value: float) -> asyncio.Future[None]:
+        """Log a set, returning a future that resolves once it is on disk."""
+        self._pending += encode_record(key, value)
+        self._since_snapshot += 1
+        return self._group()
+
+    def append_many(self, entries: Iterable[tuple[str, float]]) -> asyncio.Future[None]:
+        """Log several sets as part of the same group."""
+        for key, value in entries:
+            self._pending += encode_record(key, value)
+            self._since_snapshot += 1
+        return self._group()
+
+    def _group(self) -> asyncio.Future[None]:
+        if self._commit is None:
+            self._commit = asyncio.get_running_loop().create_future()
+            self._wakeup.set()
+        return self._commit
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.group_delay:
+                await asyncio.sleep(self.group_delay)
+            data, self._pending = bytes(self._pending), bytearray()
+            commit, self._commit = self._commit, None
+            assert self._file is not None and commit is not None
+            try:
+                await asyncio.to_thread(self._write, self._file, data)
+            except Exception as e:
+                logging.exception("failed to sync kv log")
+                commit.set_exception(e)
+            else:
+                commit.set_result(None)
+            if (
+                self._since_snapshot >= self.snapshot_every
+                and self._snapshotting is None
+            ):
+                # Let the setters this commit woke apply their values first, so the
+                # snapshot covers every record in the logs it replaces.
+                await asyncio.sleep(0)
+                self._start_snapshot()
+
+    @staticmethod
+    def _write(file: IO[bytes], data: bytes | bytearray) -> None:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    def _start_snapshot(self) -> None:
+        assert self._file is not None
+        # Switch logs and capture the store in one step. Records still pending are
+        # not in the capture yet, and will be written to the new log.
+        old_file = self._file
+        self._generation += 1
+        self._file = open(self._path(f"{LOG_PREFIX}{self._generation}"), "ab")
+        shards = self.store.copy_shards()
+        self._since_snapshot = 0
+        self._snapshotting = asyncio.create_task(
+            asyncio.to_thread(self._write_snapshot, shards, old_file, self._generation)
+        )
+        self._snapshotting.add_done_callback(self._snapshot_done)
+
+    def _snapshot_done(self, task: asyncio.Task[None]) -> None:
+        self._snapshotting = None
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("failed to write kv snapshot", exc_info=task.exception())
+
+    def _write_snapshot(
+        self,
+        shards: list[tuple[dict[str, int], Sequence[float]]],
+        old_file: IO[bytes],
+        generation: int,
+    ) -> None:
+        old_file.close()
+        data = bytearray(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, generation))
+        for slots, values in shards:
+            for key, slot in slots.items():
+                data += encode_record(key, values[slot])
+        tmp = self._path(f"{SNAPSHOT_NAME}.tmp")
+        with open(tmp, "wb") as f:
+            self._write(f, data)
+        os.replace(tmp, self._path(SNAPSHOT_NAME))
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        for old in self._log_generations():
+            if old < generation:
+                os.remove(self._path(f"{LOG_PREFIX}{old}"))
+        logging.info("wrote kv snapshot, generation %d", generation)
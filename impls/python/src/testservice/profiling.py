@@ -0,0 +1,182 @@
+"""Diagnostics for runs that flake or stall: a loop lag monitor and a sampling profiler.
+
+The lag monitor is always on. It logs every event loop stall longer than
+LOOP_LAG_MS, with the stack the loop thread was blocked in.
+
+With PROFILE_DIR set, SIGUSR1 starts sampling the loop thread's stack and the next
+SIGUSR1 stops it, writing the samples to PROFILE_DIR/<name>-<pid>-<n>.collapsed. That
+is the collapsed-stack format read by flamegraph.pl and speedscope.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from types import CodeType, FrameType
+from typing import Any, Iterator, Optional
+
+# Stalls of the event loop longer than this are logged. 0 turns the monitor off.
+LOOP_LAG_MS = float(os.getenv("LOOP_LAG_MS", "100"))
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Logs stalls of `loop` longer than `threshold` seconds.
+
+    A callback on the loop records when it last ran, every `threshold / 2` seconds. A
+    thread checks on it as often and logs the loop thread's stack once a stall passes
+    the threshold, so stalls that never end are reported too. The callback logs how
+    long the stall lasted when the loop gets back to it.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, threshold: float) -> None:
+        self._loop = loop
+        self._threshold = threshold
+        self._interval = threshold / 2
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        # The beat a stall was last reported after, to report each stall once.
+        self._reported = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._stopped = threading.Event()
+        self._watcher = threading.Thread(
+            target=self._watch, name="loop-lag-monitor", daemon=True
+        )
+
+    def start(self) -> None:
+        self._beat = time.monotonic()
+        self._handle = self._loop.call_later(self._interval, self._tick)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        self._watcher.join()
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        lag = now - self._beat - self._interval
+        if lag > self._threshold:
+            logger.warning("event loop was blocked for %.0fms", lag * 1000)
+        self._beat = now
+        self._handle = self._loop.call_later(self._interval, self._tick)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self._interval):
+            beat = self._beat
+            blocked = time.monotonic() - beat - self._interval
+            if blocked <= self._threshold or beat == self._reported:
+                continue
+            self._reported = beat
+            frame = sys._current_frames().get(self._thread_id)
+            task = asyncio.current_task(self._loop)
+            logger.warning(
+                "event loop blocked for %.0fms so far, in task %s:\n%s",
+                blocked * 1000,
+                task.get_name() if task is not None else None,
+                "".join(traceback.format_stack(frame)).rstrip(),
+            )
+
+
+class SamplingProfiler:
+    """Counts the stacks of thread `thread_id`, sampled every `interval` seconds from
+    another thread, and writes them to `path` in collapsed-stack format once stopped.
+    """
+
+    def __init__(self, path: str, interval: float, thread_id: int) -> None:
+        self.path = path
+        self._interval = interval
+        self._thread_id = thread_id
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling. The samples are written from the sampler thread."""
+        self._stopped.set()
+
+    def join(self) -> None:
+        self._sampler.join()
+
+    def _run(self) -> None:
+        logger.info("profiling every %gms to %s", self._interval * 1000, self.path)
+        counts: Counter[str] = Counter()
+        labels: dict[CodeType, str] = {}
+        while not self._stopped.wait(self._interval):
+            frame: Optional[FrameType] = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = (
+                        f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+                    )
+                stack.append(label)
+                frame = frame.f_back
+            counts[";".join(reversed(stack))] += 1
+        try:
+            with open(self.path, "w") as f:
+                for folded, count in counts.most_common():
+                    f.write(f"{folded} {count}\n")
+        except OSError:
+            logger.exception("failed to write profile")
+            return
+        logger.info("wrote %d samples to %s", counts.total(), self.path)
+
+
+@contextmanager
+def diagnostics(name: str) -> Iterator[None]:
+    """Monitor the running loop for stalls and, if PROFILE_DIR is set, profile it
+    between SIGUSR1s. `name` prefixes the profile files. Must be entered from the
+    main thread, which the loop runs on."""
+    loop = asyncio.get_running_loop()
+    monitor = LoopLagMonitor(loop, LOOP_LAG_MS / 1000) if LOOP_LAG_MS > 0 else None
+    if monitor is not None:
+        monitor.start()
+    profiler: Optional[SamplingProfiler] = None
+    profiles = 0
+
+    def toggle(signum: int, frame: Any) -> None:
+        # Runs on the main thread between bytecodes, even while the loop is blocked.
+        nonlocal profiler, profiles
+        if profiler is not None:
+            profiler.stop()
+            profiler = None
+            return
+        assert PROFILE_DIR
+        profiles += 1
+        path = os.path.join(PROFILE_DIR, f"{name}-{os.getpid()}-{profiles}.collapsed")
+        profiler = SamplingProfiler(
+            path, PROFILE_INTERVAL_MS / 1000, threading.get_ident()
+        )
+        profiler.start()
+
+    previous = None
+    if PROFILE_DIR:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        previous = signal.signal(signal.SIGUSR1, toggle)
+    try:
+        yield
+    finally:
+        if PROFILE_DIR:
+            signal.signal(signal.SIGUSR1, previous)
+        if profiler is not None:
+            profiler.stop()
+            profiler.join()
+        if monitor is not None:
+            monitor.stop()
@@ -1,16 +1,36 @@
 # Code generated by river.codegen. DO NOT EDIT.
-from typing import Literal
+from functools import cached_property
+from typing import TYPE_CHECKING, Literal
 
 import replit_river as river
 from pydantic import BaseModel  # noqa: F401
 
-from .kv import KvService
-from .repeat import RepeatService
-from .upload import UploadService
+if TYPE_CHECKING:
+    from .kv import KvService
+    from .repeat import RepeatService
+    from .upload import UploadService
 
 
 class TestCient:
-    def __init__(self, client: river.Client[Literal[None]]):
-        self.kv = KvService(client)
-        self.repeat = RepeatService(client)
-        self.upload = UploadService(client)
+    def __init__(self, client: river.Client[Literal[None]], strict: bool = False):
+        self.client = client
+        # Validate every message with pydantic rather than trusting the server.
+        self.strict = strict
+
+    @cached_property
+    def kv(self) -> "KvService":
+        from .kv import KvService
+
+        return KvService(self.client, self.strict)
+
+    @cached_property
+    def repeat(self) -> "RepeatService":
+        from .repeat import RepeatService
+
+        return RepeatService(self.client, self.strict)
+
+    @cached_property
+    def upload(self) -> "UploadService":
+        from .upload import UploadService
+
+        return UploadService(self.client, self.strict)
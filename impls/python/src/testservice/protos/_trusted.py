@@ -0,0 +1,24 @@
+# Code generated by fast-river-client.py. DO NOT EDIT.
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+_new = object.__new__
+_setattr = object.__setattr__
+
+
+def construct(cls: type[M], fields: dict[str, Any]) -> M:
+    """Build `cls` from field values that are already known to be valid.
+
+    This is what `cls.model_construct` does, minus its handling of defaults and
+    aliases: trusted codecs are only generated for models whose fields are all
+    required and unaliased.
+    """
+    model = _new(cls)
+    _setattr(model, "__dict__", fields)
+    _setattr(model, "__pydantic_fields_set__", set(fields))
+    _setattr(model, "__pydantic_extra__", None)
+    _setattr(model, "__pydantic_private__", None)
+    return model
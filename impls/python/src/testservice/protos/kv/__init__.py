@@ -7,20 +7,85 @@ import replit_river as river
 from pydantic import TypeAdapter  # noqa: F401
 from replit_river.error_schema import RiverError, RiverErrorTypeAdapter
 
-from .set import SetInput, SetInputTypeAdapter, SetOutput, SetOutputTypeAdapter
+from .mget import (
+    MgetErrors,  # noqa: F401
+    MgetErrorsTypeAdapter,
+    MgetInput,
+    MgetInputTrustedEncoder,
+    MgetInputTypeAdapter,
+    MgetOutput,
+    MgetOutputTrustedDecoder,
+    MgetOutputTypeAdapter,
+)
+from .mset import (
+    MsetInput,
+    MsetInputTrustedEncoder,
+    MsetInputTypeAdapter,
+    MsetOutput,
+    MsetOutputTrustedDecoder,
+    MsetOutputTypeAdapter,
+)
+from .set import (
+    SetInput,
+    SetInputTrustedEncoder,
+    SetInputTypeAdapter,
+    SetOutput,
+    SetOutputTrustedDecoder,
+    SetOutputTypeAdapter,
+)
 from .watch import (
     WatchErrors,
     WatchErrorsTypeAdapter,
     WatchInput,
+    WatchInputTrustedEncoder,
     WatchInputTypeAdapter,
     WatchOutput,
+    WatchOutputTrustedDecoder,
     WatchOutputTypeAdapter,
 )
+from .watch_prefix import (
+    Watch_PrefixInput,
+    Watch_PrefixInputTrustedEncoder,
+    Watch_PrefixInputTypeAdapter,
+    Watch_PrefixOutput,
+    Watch_PrefixOutputTrustedDecoder,
+    Watch_PrefixOutputTypeAdapter,
+)
+
+SetOutputStrictDecoder = SetOutputTypeAdapter.validate_python
+RiverErrorStrictDecoder = RiverErrorTypeAdapter.validate_python
+WatchOutputStrictDecoder = WatchOutputTypeAdapter.validate_python
+WatchErrorsStrictDecoder = WatchErrorsTypeAdapter.validate_python
+MsetOutputStrictDecoder = MsetOutputTypeAdapter.validate_python
+MgetOutputStrictDecoder = MgetOutputTypeAdapter.validate_python
+MgetErrorsStrictDecoder = MgetErrorsTypeAdapter.validate_python
+Watch_PrefixOutputStrictDecoder = Watch_PrefixOutputTypeAdapter.validate_python
+
+
+def SetInputStrictEncoder(x: SetInput) -> Any:
+    return SetInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
+def WatchInputStrictEncoder(x: WatchInput) -> Any:
+    return WatchInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
+def MsetInputStrictEncoder(x: MsetInput) -> Any:
+    return MsetInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
+def MgetInputStrictEncoder(x: MgetInput) -> Any:
+    return MgetInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
+def Watch_PrefixInputStrictEncoder(x: Watch_PrefixInput) -> Any:
+    return Watch_PrefixInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
 
 
 class KvService:
-    def __init__(self, client: river.Client[Any]):
+    def __init__(self, client: river.Client[Any], strict: bool = False):
         self.client = client
+        self.strict = strict
 
     async def set(
         self,
@@ -31,17 +96,9 @@ class KvService:
             "kv",
             "set",
             input,
-            lambda x: SetInputTypeAdapter.dump_python(
-                x,  # type: ignore[arg-type]
-                by_alias=True,
-                exclude_none=True,
-            ),
-            lambda x: SetOutputTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
-            lambda x: RiverErrorTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
+            SetInputStrictEncoder if self.strict else SetInputTrustedEncoder,
+            SetOutputStrictDecoder if self.strict else SetOutputTrustedDecoder,
+            RiverErrorStrictDecoder,
             timeout,
         )
 
@@ -53,15 +110,54 @@ class KvService:
             "kv",
             "watch",
             input,
-            lambda x: WatchInputTypeAdapter.dump_python(
-                x,  # type: ignore[arg-type]
-                by_alias=True,
-                exclude_none=True,
-            ),
-            lambda x: WatchOutputTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
-            lambda x: WatchErrorsTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
+            WatchInputStrictEncoder if self.strict else WatchInputTrustedEncoder,
+            WatchOutputStrictDecoder if self.strict else WatchOutputTrustedDecoder,
+            WatchErrorsStrictDecoder,
+        )
+
+    async def mset(
+        self,
+        input: MsetInput,
+        timeout: datetime.timedelta,
+    ) -> MsetOutput:
+        return await self.client.send_rpc(
+            "kv",
+            "mset",
+            input,
+            MsetInputStrictEncoder if self.strict else MsetInputTrustedEncoder,
+            MsetOutputStrictDecoder if self.strict else MsetOutputTrustedDecoder,
+            RiverErrorStrictDecoder,
+            timeout,
+        )
+
+    async def mget(
+        self,
+        input: MgetInput,
+        timeout: datetime.timedelta,
+    ) -> MgetOutput:
+        return await self.client.send_rpc(
+            "kv",
+            "mget",
+            input,
+            MgetInputStrictEncoder if self.strict else MgetInputTrustedEncoder,
+            MgetOutputStrictDecoder if self.strict else MgetOutputTrustedDecoder,
+            MgetErrorsStrictDecoder,
+            timeout,
+        )
+
+    async def watch_prefix(
+        self,
+        input: Watch_PrefixInput,
+    ) -> AsyncIterator[Watch_PrefixOutput | RiverError | RiverError]:
+        return self.client.send_subscription(
+            "kv",
+            "watch_prefix",
+            input,
+            Watch_PrefixInputStrictEncoder
+            if self.strict
+            else Watch_PrefixInputTrustedEncoder,
+            Watch_PrefixOutputStrictDecoder
+            if self.strict
+            else Watch_PrefixOutputTrustedDecoder,
+            RiverErrorStrictDecoder,
         )
@@ -0,0 +1,40 @@
+# Code generated by river.codegen. DO NOT EDIT.
+from typing import (
+    Any,
+    Literal,
+)
+
+from pydantic import BaseModel, TypeAdapter
+from replit_river.error_schema import RiverError
+
+from .._trusted import construct
+
+
+class MgetInput(BaseModel):
+    ks: list[str]
+
+
+MgetInputTypeAdapter: TypeAdapter[MgetInput] = TypeAdapter(MgetInput)
+
+
+class MgetOutput(BaseModel):
+    vs: list[float]
+
+
+MgetOutputTypeAdapter: TypeAdapter[MgetOutput] = TypeAdapter(MgetOutput)
+
+
+class MgetErrors(RiverError):
+    code: Literal["NOT_FOUND"]
+    message: str
+
+
+MgetErrorsTypeAdapter: TypeAdapter[MgetErrors] = TypeAdapter(MgetErrors)
+
+
+def MgetInputTrustedEncoder(x: MgetInput) -> dict[str, Any]:
+    return {"ks": x.ks}
+
+
+def MgetOutputTrustedDecoder(x: Any) -> MgetOutput:
+    return construct(MgetOutput, {"vs": x["vs"]})
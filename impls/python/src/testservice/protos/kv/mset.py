@@ -0,0 +1,39 @@
+# Code generated by river.codegen. DO NOT EDIT.
+from typing import (
+    Any,
+)
+
+from pydantic import BaseModel, TypeAdapter
+
+from .._trusted import construct
+
+
+class MsetInputEntries(BaseModel):
+    k: str
+    v: float
+
+
+class MsetInput(BaseModel):
+    entries: list[MsetInputEntries]
+
+
+MsetInputTypeAdapter: TypeAdapter[MsetInput] = TypeAdapter(MsetInput)
+
+
+class MsetOutput(BaseModel):
+    vs: list[float]
+
+
+MsetOutputTypeAdapter: TypeAdapter[MsetOutput] = TypeAdapter(MsetOutput)
+
+
+def MsetInputEntriesTrustedEncoder(x: MsetInputEntries) -> dict[str, Any]:
+    return {"k": x.k, "v": x.v}
+
+
+def MsetInputTrustedEncoder(x: MsetInput) -> dict[str, Any]:
+    return {"entries": [MsetInputEntriesTrustedEncoder(item) for item in x.entries]}
+
+
+def MsetOutputTrustedDecoder(x: Any) -> MsetOutput:
+    return construct(MsetOutput, {"vs": x["vs"]})
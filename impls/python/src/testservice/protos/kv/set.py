@@ -1,7 +1,12 @@
 # Code generated by river.codegen. DO NOT EDIT.
+from typing import (
+    Any,
+)
 
 from pydantic import BaseModel, TypeAdapter
 
+from .._trusted import construct
+
 
 class SetInput(BaseModel):
     k: str
@@ -16,3 +21,11 @@ class SetOutput(BaseModel):
 
 
 SetOutputTypeAdapter: TypeAdapter[SetOutput] = TypeAdapter(SetOutput)
+
+
+def SetInputTrustedEncoder(x: SetInput) -> dict[str, Any]:
+    return {"k": x.k, "v": x.v}
+
+
+def SetOutputTrustedDecoder(x: Any) -> SetOutput:
+    return construct(SetOutput, {"v": x["v"]})
@@ -1,11 +1,14 @@
 # Code generated by river.codegen. DO NOT EDIT.
 from typing import (
+    Any,
     Literal,
 )
 
 from pydantic import BaseModel, TypeAdapter
 from replit_river.error_schema import RiverError
 
+from .._trusted import construct
+
 
 class WatchInput(BaseModel):
     k: str
@@ -27,3 +30,11 @@ class WatchErrors(RiverError):
 
 
 WatchErrorsTypeAdapter: TypeAdapter[WatchErrors] = TypeAdapter(WatchErrors)
+
+
+def WatchInputTrustedEncoder(x: WatchInput) -> dict[str, Any]:
+    return {"k": x.k}
+
+
+def WatchOutputTrustedDecoder(x: Any) -> WatchOutput:
+    return construct(WatchOutput, {"v": x["v"]})
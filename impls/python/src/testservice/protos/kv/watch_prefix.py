@@ -0,0 +1,50 @@
+# Code generated by river.codegen. DO NOT EDIT.
+from typing import (
+    Any,
+)
+
+from pydantic import BaseModel, TypeAdapter
+
+from .._trusted import construct
+
+
+class Watch_PrefixInput(BaseModel):
+    prefix: str
+
+
+Watch_PrefixInputTypeAdapter: TypeAdapter[Watch_PrefixInput] = TypeAdapter(
+    Watch_PrefixInput
+)
+
+
+class Watch_PrefixOutputChanges(BaseModel):
+    k: str
+    v: float
+
+
+class Watch_PrefixOutput(BaseModel):
+    changes: list[Watch_PrefixOutputChanges]
+
+
+Watch_PrefixOutputTypeAdapter: TypeAdapter[Watch_PrefixOutput] = TypeAdapter(
+    Watch_PrefixOutput
+)
+
+
+def Watch_PrefixInputTrustedEncoder(x: Watch_PrefixInput) -> dict[str, Any]:
+    return {"prefix": x.prefix}
+
+
+def Watch_PrefixOutputChangesTrustedDecoder(x: Any) -> Watch_PrefixOutputChanges:
+    return construct(Watch_PrefixOutputChanges, {"k": x["k"], "v": x["v"]})
+
+
+def Watch_PrefixOutputTrustedDecoder(x: Any) -> Watch_PrefixOutput:
+    return construct(
+        Watch_PrefixOutput,
+        {
+            "changes": [
+                Watch_PrefixOutputChangesTrustedDecoder(item) for item in x["changes"]
+            ]
+        },
+    )
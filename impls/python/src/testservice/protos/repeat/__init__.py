@@ -7,21 +7,49 @@ import replit_river as river
 from pydantic import TypeAdapter
 from replit_river.error_schema import RiverError, RiverErrorTypeAdapter
 
-from .echo import EchoInput, EchoInputTypeAdapter, EchoOutput, EchoOutputTypeAdapter
+from .echo import (
+    EchoInput,
+    EchoInputTrustedEncoder,
+    EchoInputTypeAdapter,
+    EchoOutput,
+    EchoOutputTrustedDecoder,
+    EchoOutputTypeAdapter,
+)
 from .echo_prefix import (
     Echo_PrefixInit,
+    Echo_PrefixInitTrustedEncoder,
     Echo_PrefixInput,
+    Echo_PrefixInputTrustedEncoder,
     Echo_PrefixInputTypeAdapter,
     Echo_PrefixOutput,
+    Echo_PrefixOutputTrustedDecoder,
     Echo_PrefixOutputTypeAdapter,
 )
 
 Echo_PrefixInitTypeAdapter: TypeAdapter[Echo_PrefixInit] = TypeAdapter(Echo_PrefixInit)
 
 
+EchoOutputStrictDecoder = EchoOutputTypeAdapter.validate_python
+RiverErrorStrictDecoder = RiverErrorTypeAdapter.validate_python
+Echo_PrefixOutputStrictDecoder = Echo_PrefixOutputTypeAdapter.validate_python
+
+
+def EchoInputStrictEncoder(x: EchoInput) -> Any:
+    return EchoInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
+def Echo_PrefixInputStrictEncoder(x: Echo_PrefixInput) -> Any:
+    return Echo_PrefixInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
+def Echo_PrefixInitStrictEncoder(x: Echo_PrefixInit) -> Any:
+    return Echo_PrefixInitTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
+
+
 class RepeatService:
-    def __init__(self, client: river.Client[Any]):
+    def __init__(self, client: river.Client[Any], strict: bool = False):
         self.client = client
+        self.strict = strict
 
     async def echo(
         self,
@@ -33,17 +61,9 @@ class RepeatService:
             None,
             inputStream,
             None,
-            lambda x: EchoInputTypeAdapter.dump_python(
-                x,  # type: ignore[arg-type]
-                by_alias=True,
-                exclude_none=True,
-            ),
-            lambda x: EchoOutputTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
-            lambda x: RiverErrorTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
+            EchoInputStrictEncoder if self.strict else EchoInputTrustedEncoder,
+            EchoOutputStrictDecoder if self.strict else EchoOutputTrustedDecoder,
+            RiverErrorStrictDecoder,
         )
 
     async def echo_prefix(
@@ -56,16 +76,14 @@ class RepeatService:
             "echo_prefix",
             init,
             inputStream,
-            lambda x: Echo_PrefixInitTypeAdapter.validate_python(x),
-            lambda x: Echo_PrefixInputTypeAdapter.dump_python(
-                x,  # type: ignore[arg-type]
-                by_alias=True,
-                exclude_none=True,
-            ),
-            lambda x: Echo_PrefixOutputTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
-            lambda x: RiverErrorTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
+            Echo_PrefixInitStrictEncoder
+            if self.strict
+            else Echo_PrefixInitTrustedEncoder,
+            Echo_PrefixInputStrictEncoder
+            if self.strict
+            else Echo_PrefixInputTrustedEncoder,
+            Echo_PrefixOutputStrictDecoder
+            if self.strict
+            else Echo_PrefixOutputTrustedDecoder,
+            RiverErrorStrictDecoder,
         )
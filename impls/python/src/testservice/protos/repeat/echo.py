@@ -1,7 +1,12 @@
 # Code generated by river.codegen. DO NOT EDIT.
+from typing import (
+    Any,
+)
 
 from pydantic import BaseModel, TypeAdapter
 
+from .._trusted import construct
+
 
 class EchoInput(BaseModel):
     str: str
@@ -15,3 +20,11 @@ class EchoOutput(BaseModel):
 
 
 EchoOutputTypeAdapter: TypeAdapter[EchoOutput] = TypeAdapter(EchoOutput)
+
+
+def EchoInputTrustedEncoder(x: EchoInput) -> dict[str, Any]:
+    return {"str": x.str}
+
+
+def EchoOutputTrustedDecoder(x: Any) -> EchoOutput:
+    return construct(EchoOutput, {"out": x["out"]})
@@ -1,7 +1,12 @@
 # Code generated by river.codegen. DO NOT EDIT.
+from typing import (
+    Any,
+)
 
 from pydantic import BaseModel, TypeAdapter
 
+from .._trusted import construct
+
 
 class Echo_PrefixInit(BaseModel):
     prefix: str
@@ -23,3 +28,15 @@ class Echo_PrefixOutput(BaseModel):
 Echo_PrefixOutputTypeAdapter: TypeAdapter[Echo_PrefixOutput] = TypeAdapter(
     Echo_PrefixOutput
 )
+
+
+def Echo_PrefixInputTrustedEncoder(x: Echo_PrefixInput) -> dict[str, Any]:
+    return {"str": x.str}
+
+
+def Echo_PrefixOutputTrustedDecoder(x: Any) -> Echo_PrefixOutput:
+    return construct(Echo_PrefixOutput, {"out": x["out"]})
+
+
+def Echo_PrefixInitTrustedEncoder(x: Echo_PrefixInit) -> dict[str, Any]:
+    return {"prefix": x.prefix}
@@ -20,7 +20,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n testservice/protos/service.proto\x12\x11replit.river.test"!\n\tKVRequest\x12\t\n\x01k\x18\x01 \x01(\t\x12\t\n\x01v\x18\x02 \x01(\x02"\x17\n\nKVResponse\x12\t\n\x01v\x18\x01 \x01(\x02"\x18\n\tEchoInput\x12\x0b\n\x03str\x18\x01 \x01(\t"\x19\n\nEchoOutput\x12\x0b\n\x03out\x18\x01 \x01(\t"\x1b\n\x0bUploadInput\x12\x0c\n\x04part\x18\x01 \x01(\t"\x1b\n\x0cUploadOutput\x12\x0b\n\x03\x64oc\x18\x01 \x01(\t2\x90\x01\n\x02kv\x12\x42\n\x03set\x12\x1c.replit.river.test.KVRequest\x1a\x1d.replit.river.test.KVResponse\x12\x46\n\x05watch\x12\x1c.replit.river.test.KVRequest\x1a\x1d.replit.river.test.KVResponse0\x01\x32Q\n\x06repeat\x12G\n\x04\x65\x63ho\x12\x1c.replit.river.test.EchoInput\x1a\x1d.replit.river.test.EchoOutput(\x01\x30\x01\x32S\n\x06upload\x12I\n\x04send\x12\x1e.replit.river.test.UploadInput\x1a\x1f.replit.river.test.UploadOutput(\x01\x62\x06proto3'
+    b'\n testservice/protos/service.proto\x12\x11replit.river.test"!\n\tKVRequest\x12\t\n\x01k\x18\x01 \x01(\t\x12\t\n\x01v\x18\x02 \x01(\x02"\x17\n\nKVResponse\x12\t\n\x01v\x18\x01 \x01(\x02"?\n\x0eKVBatchRequest\x12-\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x1c.replit.river.test.KVRequest"\x1b\n\rKVKeysRequest\x12\n\n\x02ks\x18\x01 \x03(\t"\x1d\n\x0fKVBatchResponse\x12\n\n\x02vs\x18\x01 \x03(\x02"!\n\x0fKVPrefixRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t":\n\tKVChanges\x12-\n\x07\x63hanges\x18\x01 \x03(\x0b\x32\x1c.replit.river.test.KVRequest"\x18\n\tEchoInput\x12\x0b\n\x03str\x18\x01 \x01(\t".\n\x0f\x45\x63hoPrefixInput\x12\x0e\n\x06prefix\x18\x01 \x01(\t\x12\x0b\n\x03str\x18\x02 \x01(\t"\x19\n\nEchoOutput\x12\x0b\n\x03out\x18\x01 \x01(\t"\x1b\n\x0bUploadInput\x12\x0c\n\x04part\x18\x01 \x01(\t"\x1b\n\x0cUploadOutput\x12\x0b\n\x03\x64oc\x18\x01 \x01(\t2\x81\x03\n\x02kv\x12\x42\n\x03set\x12\x1c.replit.river.test.KVRequest\x1a\x1d.replit.river.test.KVResponse\x12\x46\n\x05watch\x12\x1c.replit.river.test.KVRequest\x1a\x1d.replit.river.test.KVResponse0\x01\x12M\n\x04mset\x12!.replit.river.test.KVBatchRequest\x1a".replit.river.test.KVBatchResponse\x12L\n\x04mget\x12 .replit.river.test.KVKeysRequest\x1a".replit.river.test.KVBatchResponse\x12R\n\x0cwatch_prefix\x12".replit.river.test.KVPrefixRequest\x1a\x1c.replit.river.test.KVChanges0\x01\x32\xa7\x01\n\x06repeat\x12G\n\x04\x65\x63ho\x12\x1c.replit.river.test.EchoInput\x1a\x1d.replit.river.test.EchoOutput(\x01\x30\x01\x12T\n\x0b\x65\x63ho_prefix\x12".replit.river.test.EchoPrefixInput\x1a\x1d.replit.river.test.EchoOutput(\x01\x30\x01\x32S\n\x06upload\x12I\n\x04send\x12\x1e.replit.river.test.UploadInput\x1a\x1f.replit.river.test.UploadOutput(\x01\x62\x06proto3'
 )  # noqa: E501
 
 _globals = globals()
@@ -34,18 +34,30 @@ if not _descriptor._USE_C_DESCRIPTORS:
     _globals["_KVREQUEST"]._serialized_end = 88
     _globals["_KVRESPONSE"]._serialized_start = 90
     _globals["_KVRESPONSE"]._serialized_end = 113
-    _globals["_ECHOINPUT"]._serialized_start = 115
-    _globals["_ECHOINPUT"]._serialized_end = 139
-    _globals["_ECHOOUTPUT"]._serialized_start = 141
-    _globals["_ECHOOUTPUT"]._serialized_end = 166
-    _globals["_UPLOADINPUT"]._serialized_start = 168
-    _globals["_UPLOADINPUT"]._serialized_end = 195
-    _globals["_UPLOADOUTPUT"]._serialized_start = 197
-    _globals["_UPLOADOUTPUT"]._serialized_end = 224
-    _globals["_KV"]._serialized_start = 227
-    _globals["_KV"]._serialized_end = 371
-    _globals["_REPEAT"]._serialized_start = 373
-    _globals["_REPEAT"]._serialized_end = 454
-    _globals["_UPLOAD"]._serialized_start = 456
-    _globals["_UPLOAD"]._serialized_end = 539
+    _globals["_KVBATCHREQUEST"]._serialized_start = 115
+    _globals["_KVBATCHREQUEST"]._serialized_end = 178
+    _globals["_KVKEYSREQUEST"]._serialized_start = 180
+    _globals["_KVKEYSREQUEST"]._serialized_end = 207
+    _globals["_KVBATCHRESPONSE"]._serialized_start = 209
+    _globals["_KVBATCHRESPONSE"]._serialized_end = 238
+    _globals["_KVPREFIXREQUEST"]._serialized_start = 240
+    _globals["_KVPREFIXREQUEST"]._serialized_end = 273
+    _globals["_KVCHANGES"]._serialized_start = 275
+    _globals["_KVCHANGES"]._serialized_end = 333
+    _globals["_ECHOINPUT"]._serialized_start = 335
+    _globals["_ECHOINPUT"]._serialized_end = 359
+    _globals["_ECHOPREFIXINPUT"]._serialized_start = 361
+    _globals["_ECHOPREFIXINPUT"]._serialized_end = 407
+    _globals["_ECHOOUTPUT"]._serialized_start = 409
+    _globals["_ECHOOUTPUT"]._serialized_end = 434
+    _globals["_UPLOADINPUT"]._serialized_start = 436
+    _globals["_UPLOADINPUT"]._serialized_end = 463
+    _globals["_UPLOADOUTPUT"]._serialized_start = 465
+    _globals["_UPLOADOUTPUT"]._serialized_end = 492
+    _globals["_KV"]._serialized_start = 495
+    _globals["_KV"]._serialized_end = 880
+    _globals["_REPEAT"]._serialized_start = 883
+    _globals["_REPEAT"]._serialized_end = 1050
+    _globals["_UPLOAD"]._serialized_start = 1052
+    _globals["_UPLOAD"]._serialized_end = 1135
 # @@protoc_insertion_point(module_scope)
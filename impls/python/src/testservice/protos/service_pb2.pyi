@@ -4,9 +4,11 @@ isort:skip_file
 import "google/protobuf/timestamp.proto";"""
 
 import builtins
+import collections.abc
 import typing
 
 import google.protobuf.descriptor
+import google.protobuf.internal.containers
 import google.protobuf.message
 
 DESCRIPTOR: google.protobuf.descriptor.FileDescriptor
@@ -44,6 +46,101 @@ class KVResponse(google.protobuf.message.Message):
 
 global___KVResponse = KVResponse
 
+@typing.final
+class KVBatchRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    ENTRIES_FIELD_NUMBER: builtins.int
+    @property
+    def entries(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___KVRequest
+    ]: ...  # noqa: E501
+    def __init__(
+        self,
+        *,
+        entries: collections.abc.Iterable[global___KVRequest] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["entries", b"entries"]) -> None: ...
+
+global___KVBatchRequest = KVBatchRequest
+
+@typing.final
+class KVKeysRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    KS_FIELD_NUMBER: builtins.int
+    @property
+    def ks(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[
+        builtins.str
+    ]: ...  # noqa: E501
+    def __init__(
+        self,
+        *,
+        ks: collections.abc.Iterable[builtins.str] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["ks", b"ks"]) -> None: ...
+
+global___KVKeysRequest = KVKeysRequest
+
+@typing.final
+class KVBatchResponse(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    VS_FIELD_NUMBER: builtins.int
+    @property
+    def vs(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedScalarFieldContainer[
+        builtins.float
+    ]: ...  # noqa: E501
+    def __init__(
+        self,
+        *,
+        vs: collections.abc.Iterable[builtins.float] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["vs", b"vs"]) -> None: ...
+
+global___KVBatchResponse = KVBatchResponse
+
+@typing.final
+class KVPrefixRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    PREFIX_FIELD_NUMBER: builtins.int
+    prefix: builtins.str
+    def __init__(
+        self,
+        *,
+        prefix: builtins.str = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["prefix", b"prefix"]) -> None: ...
+
+global___KVPrefixRequest = KVPrefixRequest
+
+@typing.final
+class KVChanges(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    CHANGES_FIELD_NUMBER: builtins.int
+    @property
+    def changes(
+        self,
+    ) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[
+        global___KVRequest
+    ]: ...  # noqa: E501
+    def __init__(
+        self,
+        *,
+        changes: collections.abc.Iterable[global___KVRequest] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["changes", b"changes"]) -> None: ...
+
+global___KVChanges = KVChanges
+
 @typing.final
 class EchoInput(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -59,6 +156,27 @@ class EchoInput(google.protobuf.message.Message):
 
 global___EchoInput = EchoInput
 
+@typing.final
+class EchoPrefixInput(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    PREFIX_FIELD_NUMBER: builtins.int
+    STR_FIELD_NUMBER: builtins.int
+    prefix: builtins.str
+    """Only set on the first message, which carries the stream's init payload."""
+    str: builtins.str
+    def __init__(
+        self,
+        *,
+        prefix: builtins.str = ...,
+        str: builtins.str = ...,
+    ) -> None: ...
+    def ClearField(
+        self, field_name: typing.Literal["prefix", b"prefix", "str", b"str"]
+    ) -> None: ...  # noqa: E501
+
+global___EchoPrefixInput = EchoPrefixInput
+
 @typing.final
 class EchoOutput(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -50,6 +50,24 @@ class kvStub(object):
             response_deserializer=testservice_dot_protos_dot_service__pb2.KVResponse.FromString,
             _registered_method=True,
         )
+        self.mset = channel.unary_unary(
+            "/replit.river.test.kv/mset",
+            request_serializer=testservice_dot_protos_dot_service__pb2.KVBatchRequest.SerializeToString,
+            response_deserializer=testservice_dot_protos_dot_service__pb2.KVBatchResponse.FromString,
+            _registered_method=True,
+        )
+        self.mget = channel.unary_unary(
+            "/replit.river.test.kv/mget",
+            request_serializer=testservice_dot_protos_dot_service__pb2.KVKeysRequest.SerializeToString,
+            response_deserializer=testservice_dot_protos_dot_service__pb2.KVBatchResponse.FromString,
+            _registered_method=True,
+        )
+        self.watch_prefix = channel.unary_stream(
+            "/replit.river.test.kv/watch_prefix",
+            request_serializer=testservice_dot_protos_dot_service__pb2.KVPrefixRequest.SerializeToString,
+            response_deserializer=testservice_dot_protos_dot_service__pb2.KVChanges.FromString,
+            _registered_method=True,
+        )
 
 
 class kvServicer(object):
@@ -67,6 +85,24 @@ class kvServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def mset(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def mget(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def watch_prefix(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_kvServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -80,6 +116,21 @@ def add_kvServicer_to_server(servicer, server):
             request_deserializer=testservice_dot_protos_dot_service__pb2.KVRequest.FromString,
             response_serializer=testservice_dot_protos_dot_service__pb2.KVResponse.SerializeToString,
         ),
+        "mset": grpc.unary_unary_rpc_method_handler(
+            servicer.mset,
+            request_deserializer=testservice_dot_protos_dot_service__pb2.KVBatchRequest.FromString,
+            response_serializer=testservice_dot_protos_dot_service__pb2.KVBatchResponse.SerializeToString,
+        ),
+        "mget": grpc.unary_unary_rpc_method_handler(
+            servicer.mget,
+            request_deserializer=testservice_dot_protos_dot_service__pb2.KVKeysRequest.FromString,
+            response_serializer=testservice_dot_protos_dot_service__pb2.KVBatchResponse.SerializeToString,
+        ),
+        "watch_prefix": grpc.unary_stream_rpc_method_handler(
+            servicer.watch_prefix,
+            request_deserializer=testservice_dot_protos_dot_service__pb2.KVPrefixRequest.FromString,
+            response_serializer=testservice_dot_protos_dot_service__pb2.KVChanges.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "replit.river.test.kv", rpc_method_handlers
@@ -152,6 +203,96 @@ class kv(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def mset(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/replit.river.test.kv/mset",
+            testservice_dot_protos_dot_service__pb2.KVBatchRequest.SerializeToString,
+            testservice_dot_protos_dot_service__pb2.KVBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def mget(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/replit.river.test.kv/mget",
+            testservice_dot_protos_dot_service__pb2.KVKeysRequest.SerializeToString,
+            testservice_dot_protos_dot_service__pb2.KVBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def watch_prefix(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/replit.river.test.kv/watch_prefix",
+            testservice_dot_protos_dot_service__pb2.KVPrefixRequest.SerializeToString,
+            testservice_dot_protos_dot_service__pb2.KVChanges.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
 
 class repeatStub(object):
     """Missing associated documentation comment in .proto file."""
@@ -168,6 +309,12 @@ class repeatStub(object):
             response_deserializer=testservice_dot_protos_dot_service__pb2.EchoOutput.FromString,
             _registered_method=True,
         )
+        self.echo_prefix = channel.stream_stream(
+            "/replit.river.test.repeat/echo_prefix",
+            request_serializer=testservice_dot_protos_dot_service__pb2.EchoPrefixInput.SerializeToString,
+            response_deserializer=testservice_dot_protos_dot_service__pb2.EchoOutput.FromString,
+            _registered_method=True,
+        )
 
 
 class repeatServicer(object):
@@ -179,6 +326,12 @@ class repeatServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def echo_prefix(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_repeatServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -187,6 +340,11 @@ def add_repeatServicer_to_server(servicer, server):
             request_deserializer=testservice_dot_protos_dot_service__pb2.EchoInput.FromString,
             response_serializer=testservice_dot_protos_dot_service__pb2.EchoOutput.SerializeToString,
         ),
+        "echo_prefix": grpc.stream_stream_rpc_method_handler(
+            servicer.echo_prefix,
+            request_deserializer=testservice_dot_protos_dot_service__pb2.EchoPrefixInput.FromString,
+            response_serializer=testservice_dot_protos_dot_service__pb2.EchoOutput.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "replit.river.test.repeat", rpc_method_handlers
@@ -231,6 +389,36 @@ class repeat(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def echo_prefix(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/replit.river.test.repeat/echo_prefix",
+            testservice_dot_protos_dot_service__pb2.EchoPrefixInput.SerializeToString,
+            testservice_dot_protos_dot_service__pb2.EchoOutput.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
 
 class uploadStub(object):
     """Missing associated documentation comment in .proto file."""
@@ -28,11 +28,23 @@ class kvStub:
 
     watch: grpc.UnaryStreamMultiCallable
 
+    mset: grpc.UnaryUnaryMultiCallable
+
+    mget: grpc.UnaryUnaryMultiCallable
+
+    watch_prefix: grpc.UnaryStreamMultiCallable
+
 class kvAsyncStub:
     set: grpc.aio.UnaryUnaryMultiCallable
 
     watch: grpc.aio.UnaryStreamMultiCallable
 
+    mset: grpc.aio.UnaryUnaryMultiCallable
+
+    mget: grpc.aio.UnaryUnaryMultiCallable
+
+    watch_prefix: grpc.aio.UnaryStreamMultiCallable
+
 class kvServicer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def set(
@@ -52,6 +64,33 @@ class kvServicer(metaclass=abc.ABCMeta):
         collections.abc.Iterator[testservice.protos.service_pb2.KVResponse],
         collections.abc.AsyncIterator[testservice.protos.service_pb2.KVResponse],
     ]: ...  # noqa: E501
+    @abc.abstractmethod
+    def mset(
+        self,
+        request: testservice.protos.service_pb2.KVBatchRequest,
+        context: _ServicerContext,
+    ) -> typing.Union[
+        testservice.protos.service_pb2.KVBatchResponse,
+        collections.abc.Awaitable[testservice.protos.service_pb2.KVBatchResponse],
+    ]: ...  # noqa: E501
+    @abc.abstractmethod
+    def mget(
+        self,
+        request: testservice.protos.service_pb2.KVKeysRequest,
+        context: _ServicerContext,
+    ) -> typing.Union[
+        testservice.protos.service_pb2.KVBatchResponse,
+        collections.abc.Awaitable[testservice.protos.service_pb2.KVBatchResponse],
+    ]: ...  # noqa: E501
+    @abc.abstractmethod
+    def watch_prefix(
+        self,
+        request: testservice.protos.service_pb2.KVPrefixRequest,
+        context: _ServicerContext,
+    ) -> typing.Union[
+        collections.abc.Iterator[testservice.protos.service_pb2.KVChanges],
+        collections.abc.AsyncIterator[testservice.protos.service_pb2.KVChanges],
+    ]: ...  # noqa: E501
 
 def add_kvServicer_to_server(
     servicer: kvServicer, server: typing.Union[grpc.Server, grpc.aio.Server]
@@ -63,9 +102,13 @@ class repeatStub:
     ) -> None: ...  # noqa: E501
     echo: grpc.StreamStreamMultiCallable
 
+    echo_prefix: grpc.StreamStreamMultiCallable
+
 class repeatAsyncStub:
     echo: grpc.aio.StreamStreamMultiCallable
 
+    echo_prefix: grpc.aio.StreamStreamMultiCallable
+
 class repeatServicer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def echo(
@@ -76,6 +119,17 @@ class repeatServicer(metaclass=abc.ABCMeta):
         collections.abc.Iterator[testservice.protos.service_pb2.EchoOutput],
         collections.abc.AsyncIterator[testservice.protos.service_pb2.EchoOutput],
     ]: ...  # noqa: E501
+    @abc.abstractmethod
+    def echo_prefix(
+        self,
+        request_iterator: _MaybeAsyncIterator[
+            testservice.protos.service_pb2.EchoPrefixInput
+        ],  # noqa: E501
+        context: _ServicerContext,
+    ) -> typing.Union[
+        collections.abc.Iterator[testservice.protos.service_pb2.EchoOutput],
+        collections.abc.AsyncIterator[testservice.protos.service_pb2.EchoOutput],
+    ]: ...  # noqa: E501
 
 def add_repeatServicer_to_server(
     servicer: repeatServicer, server: typing.Union[grpc.Server, grpc.aio.Server]
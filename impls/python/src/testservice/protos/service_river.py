@@ -1,145 +1,252 @@
 # ruff: noqa
 # Code generated by river.codegen. DO NOT EDIT.
-import datetime
 from typing import Any, Mapping
 
-from google.protobuf import timestamp_pb2
-from google.protobuf.wrappers_pb2 import BoolValue
-
 import replit_river as river
 
 from testservice.protos import service_pb2, service_pb2_grpc
 
 
 def _KVRequestEncoder(e: service_pb2.KVRequest) -> dict[str, Any]:
-    d: dict[str, Any] = {}
-
-    _k = e.k
-    if _k is not None:
-        d["k"] = _k
-    _v = e.v
-    if _v is not None:
-        d["v"] = _v
-    return d
+    return {
+        "k": e.k,
+        "v": e.v,
+    }
 
 
 def _KVRequestDecoder(
     d: Mapping[str, Any],
 ) -> service_pb2.KVRequest:
-    m = service_pb2.KVRequest()
     if d is None:
-        return m
-
-    if d.get("k") is not None:
-        setattr(m, "k", d["k"])
-    if d.get("v") is not None:
-        setattr(m, "v", d["v"])
-    return m
+        return service_pb2.KVRequest()
+    try:
+        return service_pb2.KVRequest(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVRequest(
+            **{k: v for k, v in d.items() if k in {"k", "v"}},
+        )
 
 
 def _KVResponseEncoder(e: service_pb2.KVResponse) -> dict[str, Any]:
-    d: dict[str, Any] = {}
-
-    _v = e.v
-    if _v is not None:
-        d["v"] = _v
-    return d
+    return {
+        "v": e.v,
+    }
 
 
 def _KVResponseDecoder(
     d: Mapping[str, Any],
 ) -> service_pb2.KVResponse:
-    m = service_pb2.KVResponse()
     if d is None:
-        return m
+        return service_pb2.KVResponse()
+    try:
+        return service_pb2.KVResponse(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVResponse(
+            **{k: v for k, v in d.items() if k in {"v"}},
+        )
+
+
+def _KVBatchRequestEncoder(e: service_pb2.KVBatchRequest) -> dict[str, Any]:
+    return {
+        "entries": [_KVRequestEncoder(item) for item in e.entries],
+    }
+
+
+def _KVBatchRequestDecoder(
+    d: Mapping[str, Any],
+) -> service_pb2.KVBatchRequest:
+    if d is None:
+        return service_pb2.KVBatchRequest()
+    try:
+        return service_pb2.KVBatchRequest(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVBatchRequest(
+            entries=[_KVRequestDecoder(item) for item in d.get("entries") or ()],
+        )
+
+
+def _KVKeysRequestEncoder(e: service_pb2.KVKeysRequest) -> dict[str, Any]:
+    return {
+        "ks": list(e.ks),
+    }
 
-    if d.get("v") is not None:
-        setattr(m, "v", d["v"])
-    return m
 
+def _KVKeysRequestDecoder(
+    d: Mapping[str, Any],
+) -> service_pb2.KVKeysRequest:
+    if d is None:
+        return service_pb2.KVKeysRequest()
+    try:
+        return service_pb2.KVKeysRequest(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVKeysRequest(
+            **{k: v for k, v in d.items() if k in {"ks"}},
+        )
+
+
+def _KVBatchResponseEncoder(e: service_pb2.KVBatchResponse) -> dict[str, Any]:
+    return {
+        "vs": list(e.vs),
+    }
 
-def _EchoInputEncoder(e: service_pb2.EchoInput) -> dict[str, Any]:
-    d: dict[str, Any] = {}
 
-    _str = e.str
-    if _str is not None:
-        d["str"] = _str
-    return d
+def _KVBatchResponseDecoder(
+    d: Mapping[str, Any],
+) -> service_pb2.KVBatchResponse:
+    if d is None:
+        return service_pb2.KVBatchResponse()
+    try:
+        return service_pb2.KVBatchResponse(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVBatchResponse(
+            **{k: v for k, v in d.items() if k in {"vs"}},
+        )
+
+
+def _KVPrefixRequestEncoder(e: service_pb2.KVPrefixRequest) -> dict[str, Any]:
+    return {
+        "prefix": e.prefix,
+    }
+
+
+def _KVPrefixRequestDecoder(
+    d: Mapping[str, Any],
+) -> service_pb2.KVPrefixRequest:
+    if d is None:
+        return service_pb2.KVPrefixRequest()
+    try:
+        return service_pb2.KVPrefixRequest(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVPrefixRequest(
+            **{k: v for k, v in d.items() if k in {"prefix"}},
+        )
+
+
+def _KVChangesEncoder(e: service_pb2.KVChanges) -> dict[str, Any]:
+    return {
+        "changes": [_KVRequestEncoder(item) for item in e.changes],
+    }
+
+
+def _KVChangesDecoder(
+    d: Mapping[str, Any],
+) -> service_pb2.KVChanges:
+    if d is None:
+        return service_pb2.KVChanges()
+    try:
+        return service_pb2.KVChanges(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.KVChanges(
+            changes=[_KVRequestDecoder(item) for item in d.get("changes") or ()],
+        )
+
+
+def _EchoInputEncoder(e: service_pb2.EchoInput) -> dict[str, Any]:
+    return {
+        "str": e.str,
+    }
 
 
 def _EchoInputDecoder(
     d: Mapping[str, Any],
 ) -> service_pb2.EchoInput:
-    m = service_pb2.EchoInput()
     if d is None:
-        return m
+        return service_pb2.EchoInput()
+    try:
+        return service_pb2.EchoInput(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.EchoInput(
+            **{k: v for k, v in d.items() if k in {"str"}},
+        )
+
+
+def _EchoPrefixInputEncoder(e: service_pb2.EchoPrefixInput) -> dict[str, Any]:
+    return {
+        "prefix": e.prefix,
+        "str": e.str,
+    }
 
-    if d.get("str") is not None:
-        setattr(m, "str", d["str"])
-    return m
+
+def _EchoPrefixInputDecoder(
+    d: Mapping[str, Any],
+) -> service_pb2.EchoPrefixInput:
+    if d is None:
+        return service_pb2.EchoPrefixInput()
+    try:
+        return service_pb2.EchoPrefixInput(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.EchoPrefixInput(
+            **{k: v for k, v in d.items() if k in {"prefix", "str"}},
+        )
 
 
 def _EchoOutputEncoder(e: service_pb2.EchoOutput) -> dict[str, Any]:
-    d: dict[str, Any] = {}
-
-    _out = e.out
-    if _out is not None:
-        d["out"] = _out
-    return d
+    return {
+        "out": e.out,
+    }
 
 
 def _EchoOutputDecoder(
     d: Mapping[str, Any],
 ) -> service_pb2.EchoOutput:
-    m = service_pb2.EchoOutput()
     if d is None:
-        return m
-
-    if d.get("out") is not None:
-        setattr(m, "out", d["out"])
-    return m
+        return service_pb2.EchoOutput()
+    try:
+        return service_pb2.EchoOutput(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.EchoOutput(
+            **{k: v for k, v in d.items() if k in {"out"}},
+        )
 
 
 def _UploadInputEncoder(e: service_pb2.UploadInput) -> dict[str, Any]:
-    d: dict[str, Any] = {}
-
-    _part = e.part
-    if _part is not None:
-        d["part"] = _part
-    return d
+    return {
+        "part": e.part,
+    }
 
 
 def _UploadInputDecoder(
     d: Mapping[str, Any],
 ) -> service_pb2.UploadInput:
-    m = service_pb2.UploadInput()
     if d is None:
-        return m
-
-    if d.get("part") is not None:
-        setattr(m, "part", d["part"])
-    return m
+        return service_pb2.UploadInput()
+    try:
+        return service_pb2.UploadInput(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.UploadInput(
+            **{k: v for k, v in d.items() if k in {"part"}},
+        )
 
 
 def _UploadOutputEncoder(e: service_pb2.UploadOutput) -> dict[str, Any]:
-    d: dict[str, Any] = {}
-
-    _doc = e.doc
-    if _doc is not None:
-        d["doc"] = _doc
-    return d
+    return {
+        "doc": e.doc,
+    }
 
 
 def _UploadOutputDecoder(
     d: Mapping[str, Any],
 ) -> service_pb2.UploadOutput:
-    m = service_pb2.UploadOutput()
     if d is None:
-        return m
-
-    if d.get("doc") is not None:
-        setattr(m, "doc", d["doc"])
-    return m
+        return service_pb2.UploadOutput()
+    try:
+        return service_pb2.UploadOutput(**d)
+    except ValueError:
+        # The payload has keys this message doesn't know about.
+        return service_pb2.UploadOutput(
+            **{k: v for k, v in d.items() if k in {"doc"}},
+        )
 
 
 def add_kvServicer_to_server(
@@ -165,6 +272,30 @@ def add_kvServicer_to_server(
                 _KVResponseEncoder,
             ),
         ),
+        ("kv", "mset"): (
+            "rpc",
+            river.rpc_method_handler(
+                servicer.mset,  # type: ignore
+                _KVBatchRequestDecoder,
+                _KVBatchResponseEncoder,
+            ),
+        ),
+        ("kv", "mget"): (
+            "rpc",
+            river.rpc_method_handler(
+                servicer.mget,  # type: ignore
+                _KVKeysRequestDecoder,
+                _KVBatchResponseEncoder,
+            ),
+        ),
+        ("kv", "watch_prefix"): (
+            "subscription-stream",
+            river.subscription_method_handler(
+                servicer.watch_prefix,  # type: ignore
+                _KVPrefixRequestDecoder,
+                _KVChangesEncoder,
+            ),
+        ),
     }
     server.add_rpc_handlers(rpc_method_handlers)
 
@@ -184,6 +315,14 @@ def add_repeatServicer_to_server(
                 _EchoOutputEncoder,
             ),
         ),
+        ("repeat", "echo_prefix"): (
+            "stream",
+            river.stream_method_handler(
+                servicer.echo_prefix,  # type: ignore
+                _EchoPrefixInputDecoder,
+                _EchoOutputEncoder,
+            ),
+        ),
     }
     server.add_rpc_handlers(rpc_method_handlers)
 
@@ -7,12 +7,27 @@ import replit_river as river
 from pydantic import TypeAdapter  # noqa: F401
 from replit_river.error_schema import RiverError, RiverErrorTypeAdapter
 
-from .send import SendInput, SendInputTypeAdapter, SendOutput, SendOutputTypeAdapter
+from .send import (
+    SendInput,
+    SendInputTrustedEncoder,
+    SendInputTypeAdapter,
+    SendOutput,
+    SendOutputTrustedDecoder,
+    SendOutputTypeAdapter,
+)
+
+SendOutputStrictDecoder = SendOutputTypeAdapter.validate_python
+RiverErrorStrictDecoder = RiverErrorTypeAdapter.validate_python
+
+
+def SendInputStrictEncoder(x: SendInput) -> Any:
+    return SendInputTypeAdapter.dump_python(x, by_alias=True, exclude_none=True)
 
 
 class UploadService:
-    def __init__(self, client: river.Client[Any]):
+    def __init__(self, client: river.Client[Any], strict: bool = False):
         self.client = client
+        self.strict = strict
 
     async def send(
         self,
@@ -24,15 +39,7 @@ class UploadService:
             None,
             inputStream,
             None,
-            lambda x: SendInputTypeAdapter.dump_python(
-                x,  # type: ignore[arg-type]
-                by_alias=True,
-                exclude_none=True,
-            ),
-            lambda x: SendOutputTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
-            lambda x: RiverErrorTypeAdapter.validate_python(
-                x  # type: ignore[arg-type]
-            ),
+            SendInputStrictEncoder if self.strict else SendInputTrustedEncoder,
+            SendOutputStrictDecoder if self.strict else SendOutputTrustedDecoder,
+            RiverErrorStrictDecoder,
         )
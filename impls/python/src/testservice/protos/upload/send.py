@@ -1,10 +1,13 @@
 # Code generated by river.codegen. DO NOT EDIT.
 from typing import (
+    Any,
     Literal,
 )
 
 from pydantic import BaseModel, TypeAdapter
 
+from .._trusted import construct
+
 SendInputPart = Literal["EOF"] | str
 
 
@@ -20,3 +23,11 @@ class SendOutput(BaseModel):
 
 
 SendOutputTypeAdapter: TypeAdapter[SendOutput] = TypeAdapter(SendOutput)
+
+
+def SendInputTrustedEncoder(x: SendInput) -> dict[str, Any]:
+    return {"part": x.part}
+
+
+def SendOutputTrustedDecoder(x: Any) -> SendOutput:
+    return construct(SendOutput, {"doc": x["doc"]})
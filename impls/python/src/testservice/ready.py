@@ -0,0 +1,19 @@
+import logging
+import os
+import time
+
+# Wall clock time, in ns since the epoch, at which the container entrypoint launched
+# this process. See the dockerfiles.
+CONTAINER_STARTED_NS = os.getenv("CONTAINER_STARTED_NS")
+
+logger = logging.getLogger(__name__)
+# Startup timing is reported even when LOG_LEVEL hides other info records.
+logger.setLevel(logging.INFO)
+
+
+def log_time_to_ready(what: str) -> None:
+    """Log how long it took from launching the process until `what` was ready."""
+    if not CONTAINER_STARTED_NS:
+        return
+    elapsed_ms = (time.time_ns() - int(CONTAINER_STARTED_NS)) / 1e6
+    logger.info("%s ready %.1fms after launch", what, elapsed_ms)
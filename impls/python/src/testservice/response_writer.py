@@ -0,0 +1,53 @@
+import asyncio
+import sys
+from typing import BinaryIO, Callable, Optional
+
+
+class ResponseWriter:
+    """Coalesces driver response lines into batched stdout writes.
+
+    Lines are flushed once `max_bytes` are buffered or `max_delay` seconds after the
+    first buffered line. While `idle()` reports that no driver commands are waiting,
+    lines are flushed at the end of the current event loop iteration instead, so a
+    driver waiting on a response isn't held back by the deadline.
+    """
+
+    def __init__(
+        self,
+        out: Optional[BinaryIO] = None,
+        max_bytes: int = 64 * 1024,
+        max_delay: float = 0.002,
+    ) -> None:
+        self._out = out
+        self._max_bytes = max_bytes
+        self._max_delay = max_delay
+        self._lines: list[str] = []
+        self._size = 0
+        self._handle: Optional[asyncio.Handle] = None
+        self.idle: Callable[[], bool] = lambda: True
+
+    def write(self, line: str) -> None:
+        self._lines.append(line)
+        self._size += len(line) + 1
+        if self._size >= self._max_bytes:
+            self.flush()
+        elif self._handle is None:
+            loop = asyncio.get_running_loop()
+            if self.idle():
+                self._handle = loop.call_soon(self.flush)
+            else:
+                self._handle = loop.call_later(self._max_delay, self.flush)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._lines:
+            return
+        self._lines.append("")
+        data = "\n".join(self._lines).encode()
+        self._lines.clear()
+        self._size = 0
+        out = self._out or sys.stdout.buffer
+        out.write(data)
+        out.flush()
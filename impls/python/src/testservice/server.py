@@ -1,23 +1,44 @@
+import argparse
 import asyncio
 import logging
+import mmap
 import os
+import resource
+import socket
+import tempfile
+import time
+from collections import deque
 from typing import (
+    IO,
+    TYPE_CHECKING,
     AsyncIterator,
-    Awaitable,
-    Callable,
-    Dict,
-    Generic,
+    Collection,
+    Iterator,
+    Literal,
     Optional,
+    Protocol,
+    Sized,
     TypeVar,
+    cast,
+    get_args,
+    runtime_checkable,
 )
 
 import replit_river as river
-from grpc import ServicerContext
 from replit_river.error_schema import RiverError
 from replit_river.transport_options import TransportOptions
 from websockets import Headers, Request, Response, ServerConnection, serve
 
+from testservice import logs, loop
+from testservice.kvstore import Delivery, KvStore, resolve
+from testservice.metrics import CONTENT_TYPE, MetricFamily, Metrics
+from testservice.persistence import KvLog
+from testservice.profiling import diagnostics
 from testservice.protos import service_pb2, service_pb2_grpc, service_river
+from testservice.ready import log_time_to_ready
+
+if TYPE_CHECKING:
+    from grpc import ServicerContext
 
 PORT = os.getenv("PORT")
 CLIENT_TRANSPORT_ID = os.getenv("CLIENT_TRANSPORT_ID")
@@ -25,105 +46,567 @@ SERVER_TRANSPORT_ID = os.getenv("SERVER_TRANSPORT_ID")
 HEARTBEAT_MS = int(os.getenv("HEARTBEAT_MS", "500"))
 HEARTBEATS_UNTIL_DEAD = int(os.getenv("HEARTBEATS_UNTIL_DEAD", "2"))
 SESSION_DISCONNECT_GRACE_MS = int(os.getenv("SESSION_DISCONNECT_GRACE_MS", "3000"))
+# Largest document, in characters, that upload.send will accept.
+UPLOAD_MAX_DOC_SIZE = int(os.getenv("UPLOAD_MAX_DOC_SIZE", str(64 * 1024 * 1024)))
+# Documents larger than this, in characters, are spilled to a temp file while they
+# are being uploaded.
+UPLOAD_SPILL_SIZE = int(os.getenv("UPLOAD_SPILL_SIZE", str(8 * 1024 * 1024)))
 
-T = TypeVar("T")
+OverflowPolicy = Literal["drop-oldest", "coalesce", "disconnect"]
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="Python Server %(asctime)s - %(levelname)s - %(message)s",
+# Max updates buffered per kv.watch subscriber, and what to do once it is full.
+WATCH_QUEUE_SIZE = int(os.getenv("WATCH_QUEUE_SIZE", "1024"))
+WATCH_OVERFLOW_POLICY = cast(
+    OverflowPolicy, os.getenv("WATCH_OVERFLOW_POLICY", "coalesce")
 )
+assert WATCH_OVERFLOW_POLICY in get_args(OverflowPolicy), WATCH_OVERFLOW_POLICY
+# Longest kv.set and kv.mset wait for watchers of the keys to send the update, so
+# the response follows it.
+WATCH_DELIVERY_TIMEOUT_MS = float(os.getenv("WATCH_DELIVERY_TIMEOUT_MS", "100"))
+# How long kv.watch_prefix gathers changes before sending them as one frame.
+WATCH_PREFIX_WINDOW_MS = float(os.getenv("WATCH_PREFIX_WINDOW_MS", "2"))
+# Number of independent dicts the kv store spreads its keys over.
+KV_SHARDS = int(os.getenv("KV_SHARDS", "16"))
+# When set, kv state is persisted to a write-ahead log and snapshots in this
+# directory and replayed on startup.
+KV_DATA_DIR = os.getenv("KV_DATA_DIR")
+KV_SNAPSHOT_EVERY = int(os.getenv("KV_SNAPSHOT_EVERY", "100000"))
+# Extra time to wait for more sets to join a group before each fsync.
+KV_FSYNC_DELAY_MS = float(os.getenv("KV_FSYNC_DELAY_MS", "0"))
+# Count calls per procedure and serve them, with kv and upload state, on /metrics.
+SERVER_METRICS = os.getenv("SERVER_METRICS", "1") == "1"
+# Where the server listens, unless it is handed a socket.
+HOST = "0.0.0.0"
+LISTEN_PORT = 8080
+
+logs.configure()
+
+
+class WatchStats:
+    """Counters shared by every kv.watch subscriber queue."""
+
+    __slots__ = ("dropped", "coalesced", "disconnected", "late")
+
+    def __init__(self) -> None:
+        self.dropped = 0
+        self.coalesced = 0
+        self.disconnected = 0
+        # Updates a setter stopped waiting for.
+        self.late = 0
+
+
+class WatchQueue:
+    """Bounded queue of updates for one kv.watch subscriber.
+
+    When the subscriber falls `maxsize` updates behind, `policy` decides what happens:
+    "drop-oldest" discards the oldest buffered update, "coalesce" collapses the
+    backlog into the latest value, and "disconnect" stops delivery so the subscriber
+    can be closed with an error.
+
+    While the subscriber keeps up, each update carries a `Delivery` that resolves
+    when the subscriber comes back for the next update, i.e. once this one has been
+    handed to the outgoing stream. A setter that gives up on a delivery cancels it;
+    until the subscriber catches up, later updates carry none.
+    """
+
+    __slots__ = (
+        "_items",
+        "_maxsize",
+        "_waiter",
+        "_forwarding",
+        "policy",
+        "stats",
+        "dropped",
+        "coalesced",
+        "overflowed",
+    )
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy, stats: WatchStats):
+        self._items: deque[tuple[float, Optional[Delivery]]] = deque()
+        self._maxsize = maxsize
+        self._waiter: Optional[asyncio.Future[None]] = None
+        self._forwarding: Optional[Delivery] = None
+        self.policy = policy
+        self.stats = stats
+        self.dropped = 0
+        self.coalesced = 0
+        self.overflowed = False
+
+    def put(self, value: float) -> Optional[Delivery]:
+        if self.overflowed:
+            return None
+        # Only wait on subscribers that are keeping up: every queued update has a
+        # delivery, and no setter has given up on one or on the update being sent.
+        if self._items:
+            last = self._items[-1][1]
+            keeping_up = last is not None and not last.cancelled()
+        else:
+            keeping_up = self._forwarding is None or not self._forwarding.cancelled()
+        if len(self._items) >= self._maxsize:
+            match self.policy:
+                case "drop-oldest":
+                    resolve(self._items.popleft()[1])
+                    self.dropped += 1
+                    self.stats.dropped += 1
+                case "coalesce":
+                    backlog = len(self._items)
+                    for _, discarded in self._items:
+                        resolve(discarded)
+                    self._items.clear()
+                    self.coalesced += backlog
+                    self.stats.coalesced += backlog
+                case "disconnect":
+                    self.overflowed = True
+                    self.stats.disconnected += 1
+                    return None
+        delivery: Optional[Delivery] = None
+        if keeping_up:
+            delivery = asyncio.get_running_loop().create_future()
+        self._items.append((value, delivery))
+        resolve(self._waiter)
+        return delivery
+
+    async def get(self) -> float:
+        # Coming back for more means the previous update has been forwarded.
+        resolve(self._forwarding)
+        self._forwarding = None
+        while not self._items:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        value, self._forwarding = self._items.popleft()
+        return value
+
+    def __len__(self) -> int:
+        return len(self._items)
 
+    def close(self) -> None:
+        resolve(self._forwarding)
+        for _, delivery in self._items:
+            resolve(delivery)
+        self._items.clear()
 
-class Observable(Generic[T]):
-    value: T
 
-    def __init__(self, initial_value: T):
-        self.value = initial_value
-        self.listeners: list[Callable[[T], Awaitable[None]]] = []
+class ChangeQueue:
+    """Changed keys waiting to be sent to one kv.watch_prefix subscriber.
 
-    def get(self) -> T:
-        return self.value
+    Only the latest value of each key is kept, so the backlog is bounded by the
+    number of keys under the prefix. Setters never wait on a frame: changes are
+    coalesced over a window, so there is no order to keep with their responses.
+    """
 
-    async def set(self, value: T) -> None:
-        new_value = value
-        self.value = new_value
-        for listener in self.listeners:
-            await listener(new_value)
+    __slots__ = ("_changes", "_waiter", "window")
 
-    async def observe(
-        self, listener: Callable[[T], Awaitable[None]]
-    ) -> Callable[[], None]:
-        self.listeners.append(listener)
-        await listener(self.get())  # Initial call for the current value
-        return lambda: self.listeners.remove(listener)
+    def __init__(self, window: float) -> None:
+        self._changes: dict[str, float] = {}
+        self._waiter: Optional[asyncio.Future[None]] = None
+        self.window = window
+
+    def put(self, key: str, value: float) -> None:
+        self._changes[key] = value
+        resolve(self._waiter)
+
+    async def get(self) -> dict[str, float]:
+        while not self._changes:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        if self.window:
+            # Let changes arriving shortly after the first join the same frame.
+            await asyncio.sleep(self.window)
+        changes, self._changes = self._changes, {}
+        return changes
+
+    def __len__(self) -> int:
+        return len(self._changes)
+
+    def close(self) -> None:
+        self._changes.clear()
 
 
 class KvServicer(service_pb2_grpc.kvServicer):
-    def __init__(self) -> None:
-        self.kv: Dict[str, Observable[float]] = {}
+    def __init__(
+        self,
+        watch_queue_size: int = WATCH_QUEUE_SIZE,
+        watch_overflow_policy: OverflowPolicy = WATCH_OVERFLOW_POLICY,
+        kv_shards: int = KV_SHARDS,
+        data_dir: Optional[str] = KV_DATA_DIR,
+        watch_prefix_window: float = WATCH_PREFIX_WINDOW_MS / 1000,
+        watch_delivery_timeout: float = WATCH_DELIVERY_TIMEOUT_MS / 1000,
+    ) -> None:
+        self.kv = KvStore(kv_shards)
+        self.log: Optional[KvLog] = None
+        if data_dir:
+            self.log = KvLog(
+                self.kv,
+                data_dir,
+                snapshot_every=KV_SNAPSHOT_EVERY,
+                group_delay=KV_FSYNC_DELAY_MS / 1000,
+            )
+            started = time.perf_counter()
+            replayed = self.log.load()
+            logging.info(
+                "replayed %d kv records from %s in %.3fs",
+                replayed,
+                data_dir,
+                time.perf_counter() - started,
+            )
+        self.watch_queue_size = watch_queue_size
+        self.watch_overflow_policy: OverflowPolicy = watch_overflow_policy
+        self.watch_stats = WatchStats()
+        self.watch_prefix_window = watch_prefix_window
+        self.watch_delivery_timeout = watch_delivery_timeout
+        self.watch_queues: set[WatchQueue] = set()
+        self.prefix_queues: set[ChangeQueue] = set()
 
     async def set(
-        self, request: service_pb2.KVRequest, context: ServicerContext
+        self, request: service_pb2.KVRequest, context: "ServicerContext"
     ) -> service_pb2.KVResponse:
         key, value = request.k, request.v
-        if key not in self.kv:
-            self.kv[key] = Observable(value)
-        else:
-            await self.kv[key].set(value)
-        # This is a hack to let `watch` return faster than `set`
-        # to match the order in test
-        await asyncio.sleep(1 / 100_000_000)
-        return service_pb2.KVResponse(v=self.kv[key].get())
+        if self.log is not None:
+            # Write ahead, so watchers never see a value that a crash would lose.
+            # Sets committed in the same group are applied in the order they came in.
+            await self.log.append(key, value)
+        delivered = self.kv.set(key, value)
+        if delivered:
+            # Send the response after the watchers' updates, to match the order in
+            # test.
+            await self._wait_for_watchers(delivered)
+        # Respond with the value this call committed; a pipelined `set` on the same
+        # key may already have replaced it.
+        return service_pb2.KVResponse(v=value)
+
+    async def mset(
+        self, request: service_pb2.KVBatchRequest, context: "ServicerContext"
+    ) -> service_pb2.KVBatchResponse:
+        entries = [(entry.k, entry.v) for entry in request.entries]
+        if self.log is not None:
+            await self.log.append_many(entries)
+        # Watchers of a key set more than once only see its last value in the batch.
+        delivered = self.kv.set_many(entries)
+        if delivered:
+            await self._wait_for_watchers(delivered)
+        return service_pb2.KVBatchResponse(vs=[value for _, value in entries])
+
+    async def _wait_for_watchers(self, delivered: list[Delivery]) -> None:
+        """Wait until the watchers have handed their updates to their streams, for at
+        most `watch_delivery_timeout`. Deliveries still pending then are cancelled, so
+        those watchers aren't waited on again until they catch up."""
+        try:
+            async with asyncio.timeout(self.watch_delivery_timeout):
+                # Most are done by the time the first one is, so awaiting them in
+                # turn costs less than waiting on all of them at once.
+                for delivery in delivered:
+                    await delivery
+        except TimeoutError:
+            for delivery in delivered:
+                if not delivery.done():
+                    delivery.cancel()
+                # Including the one awaited when the time ran out.
+                if delivery.cancelled():
+                    self.watch_stats.late += 1
+
+    async def mget(  # type: ignore[override]
+        self, request: service_pb2.KVKeysRequest, context: "ServicerContext"
+    ) -> service_pb2.KVBatchResponse | RiverError:
+        values: list[float] = []
+        for key in request.ks:
+            if key not in self.kv:
+                return RiverError(code="NOT_FOUND", message=f"Key {key} not found")
+            values.append(self.kv.get(key))
+        return service_pb2.KVBatchResponse(vs=values)
 
     async def watch(  # type: ignore
-        self, request: service_pb2.KVRequest, context: ServicerContext
+        self, request: service_pb2.KVRequest, context: "ServicerContext"
     ) -> AsyncIterator[service_pb2.KVResponse | RiverError]:
         key = request.k
         value = request.v
         if key not in self.kv:
             yield RiverError(code="NOT_FOUND", message=f"Key {key} not found")
             return
-        observable = self.kv[key]
-
-        queue = asyncio.Queue[float]()
-
-        async def listener(value: float) -> None:
-            await queue.put(value)
-
-        unsubscribe = await observable.observe(listener)
+        queue = WatchQueue(
+            self.watch_queue_size, self.watch_overflow_policy, self.watch_stats
+        )
+        unsubscribe = self.kv.observe(key, queue.put)
+        self.watch_queues.add(queue)
         try:
             while True:
                 value = await queue.get()
+                if queue.overflowed:
+                    yield RiverError(
+                        code="SLOW_CONSUMER",
+                        message=f"Watcher of {key} fell too far behind",
+                    )
+                    return
                 yield service_pb2.KVResponse(v=value)
         finally:
             unsubscribe()
+            self.watch_queues.discard(queue)
+            queue.close()
+            if queue.dropped or queue.coalesced:
+                logging.info(
+                    "watch of %s dropped %d and coalesced %d updates",
+                    key,
+                    queue.dropped,
+                    queue.coalesced,
+                )
+
+    async def watch_prefix(  # type: ignore
+        self, request: service_pb2.KVPrefixRequest, context: "ServicerContext"
+    ) -> AsyncIterator[service_pb2.KVChanges]:
+        prefix = request.prefix
+        queue = ChangeQueue(self.watch_prefix_window)
+        # Sets that land while the current values are being sent go out next frame.
+        unsubscribe = self.kv.observe_prefix(prefix, queue.put)
+        self.prefix_queues.add(queue)
+        try:
+            yield service_pb2.KVChanges(
+                changes=[
+                    service_pb2.KVRequest(k=key, v=self.kv.get(key))
+                    for key in self.kv.keys_with_prefix(prefix)
+                ]
+            )
+            while True:
+                changes = await queue.get()
+                yield service_pb2.KVChanges(
+                    changes=[
+                        service_pb2.KVRequest(k=key, v=value)
+                        for key, value in changes.items()
+                    ]
+                )
+        finally:
+            unsubscribe()
+            self.prefix_queues.discard(queue)
+            queue.close()
+
+    def collect_metrics(self) -> Iterator[MetricFamily]:
+        yield "testservice_kv_keys", "gauge", "Keys in the store.", [("", len(self.kv))]
+        queues: dict[str, Collection[Sized]] = {
+            "watch": self.watch_queues,
+            "watch_prefix": self.prefix_queues,
+        }
+        yield (
+            "testservice_watch_subscribers",
+            "gauge",
+            "Open kv.watch and kv.watch_prefix subscriptions.",
+            [(f'kind="{kind}"', len(qs)) for kind, qs in queues.items()],
+        )
+        yield (
+            "testservice_watch_queued",
+            "gauge",
+            "Updates or changed keys waiting to be sent, over all subscribers.",
+            [(f'kind="{kind}"', sum(map(len, qs))) for kind, qs in queues.items()],
+        )
+        yield (
+            "testservice_watch_max_queued",
+            "gauge",
+            "Most updates or changed keys waiting to be sent to one subscriber.",
+            [
+                (f'kind="{kind}"', max(map(len, qs), default=0))
+                for kind, qs in queues.items()
+            ],
+        )
+        stats = self.watch_stats
+        yield (
+            "testservice_watch_overflow_total",
+            "counter",
+            "kv.watch updates dropped or coalesced, and subscribers disconnected, "
+            "because a subscriber fell behind.",
+            [
+                ('outcome="dropped"', stats.dropped),
+                ('outcome="coalesced"', stats.coalesced),
+                ('outcome="disconnected"', stats.disconnected),
+            ],
+        )
+        yield (
+            "testservice_watch_late_total",
+            "counter",
+            "kv.watch updates that kv.set or kv.mset stopped waiting to be sent.",
+            [("", stats.late)],
+        )
+
+
+class SpillingBuffer:
+    """Accumulates string parts in memory, spilling to a temp file past `spill_size`.
+
+    Once spilled, parts are written out in batches of up to `spill_size` characters,
+    and the final value is decoded straight out of an mmap of the file, so the whole
+    document is only ever materialized once. File I/O runs in a thread, so a large
+    upload doesn't stall the other streams.
+    """
+
+    def __init__(self, spill_size: int) -> None:
+        self.spill_size = spill_size
+        self.size = 0
+        self._parts: list[str] = []
+        # Characters in `_parts`.
+        self._buffered = 0
+        self._file: Optional[IO[bytes]] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    async def append(self, part: str) -> None:
+        self.size += len(part)
+        self._buffered += len(part)
+        self._parts.append(part)
+        if self._buffered > self.spill_size:
+            parts, self._parts, self._buffered = self._parts, [], 0
+            file = self._file
+            if file is None:
+                file = self._file = await asyncio.to_thread(self._open)
+            await asyncio.to_thread(self._write, file, parts)
+
+    async def getvalue(self) -> str:
+        if self._file is None:
+            return "".join(self._parts)
+        parts, self._parts, self._buffered = self._parts, [], 0
+        return await asyncio.to_thread(self._read, self._file, parts)
+
+    @staticmethod
+    def _open() -> IO[bytes]:
+        return tempfile.TemporaryFile(buffering=1024 * 1024)
+
+    @staticmethod
+    def _write(file: IO[bytes], parts: list[str]) -> None:
+        for part in parts:
+            file.write(part.encode())
+
+    @classmethod
+    def _read(cls, file: IO[bytes], parts: list[str]) -> str:
+        cls._write(file, parts)
+        file.flush()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return str(m, "utf-8")
+
+    async def close(self) -> None:
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+        self._parts.clear()
 
 
 class UploadServicer(service_pb2_grpc.uploadServicer):
-    async def send(  # pyright: ignore
+    def __init__(
+        self,
+        max_doc_size: int = UPLOAD_MAX_DOC_SIZE,
+        spill_size: int = UPLOAD_SPILL_SIZE,
+    ) -> None:
+        self.max_doc_size = max_doc_size
+        self.spill_size = spill_size
+        self.received = 0
+        self.spilled = 0
+
+    async def send(  # type: ignore[override]
         self,
         request_iterator: AsyncIterator[service_pb2.UploadInput],
-        context: ServicerContext,
-    ) -> service_pb2.UploadOutput:
-        doc = ""
-        async for request in request_iterator:
-            if request.part == "EOF":
-                break
-            doc += request.part
-        return service_pb2.UploadOutput(doc=doc)
+        context: "ServicerContext",
+    ) -> service_pb2.UploadOutput | RiverError:
+        doc = SpillingBuffer(self.spill_size)
+        try:
+            async for request in request_iterator:
+                if request.part == "EOF":
+                    break
+                if doc.size + len(request.part) > self.max_doc_size:
+                    return RiverError(
+                        code="DOCUMENT_TOO_LARGE",
+                        message=f"Document exceeds {self.max_doc_size} characters",
+                    )
+                await doc.append(request.part)
+            return service_pb2.UploadOutput(doc=await doc.getvalue())
+        finally:
+            self.received += doc.size
+            self.spilled += doc.spilled
+            # getrusage is a syscall, so skip it when the record would be dropped.
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info(
+                    "upload of %d characters finished, spilled: %s, peak RSS: %d KiB",
+                    doc.size,
+                    doc.spilled,
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                )
+            await doc.close()
+
+    def collect_metrics(self) -> Iterator[MetricFamily]:
+        yield (
+            "testservice_upload_received_characters_total",
+            "counter",
+            "Characters received by upload.send, which are bytes for ASCII documents.",
+            [("", self.received)],
+        )
+        yield (
+            "testservice_upload_spilled_total",
+            "counter",
+            "Uploads spilled to a temp file.",
+            [("", self.spilled)],
+        )
+
+
+T = TypeVar("T")
+T_co = TypeVar("T_co", covariant=True)
+
+
+@runtime_checkable
+class BufferedStream(Protocol[T_co]):
+    """The non-blocking side of the channel river hands stream handlers."""
+
+    def empty(self) -> bool: ...
+
+    def get_nowait(self) -> T_co: ...
+
+
+async def batches(requests: AsyncIterator[T]) -> AsyncIterator[list[T]]:
+    """Group stream inputs into lists of everything buffered at each wakeup.
+
+    Only the first input of each batch is awaited; the rest are taken without
+    suspending, which saves a trip through the event loop per input.
+    """
+    # Checking against a runtime_checkable Protocol is slow, so do it once.
+    buffered = requests if isinstance(requests, BufferedStream) else None
+    async for request in requests:
+        batch = [request]
+        if buffered is not None:
+            while not buffered.empty():
+                batch.append(buffered.get_nowait())
+        yield batch
 
 
 class RepeatServicer(service_pb2_grpc.repeatServicer):
-    async def echo(  # pyright: ignore
+    async def echo(  # type: ignore[override]
         self,
         request_iterator: AsyncIterator[service_pb2.EchoInput],
-        context: ServicerContext,
+        context: "ServicerContext",
     ) -> AsyncIterator[service_pb2.EchoOutput]:
-        async for request in request_iterator:
-            yield service_pb2.EchoOutput(out=request.str)
+        async for batch in batches(request_iterator):
+            for request in batch:
+                yield service_pb2.EchoOutput(out=request.str)
 
+    async def echo_prefix(  # type: ignore[override]
+        self,
+        request_iterator: AsyncIterator[service_pb2.EchoPrefixInput],
+        context: "ServicerContext",
+    ) -> AsyncIterator[service_pb2.EchoOutput]:
+        # Protocol v1 streams send the init payload as the first message.
+        async for init in request_iterator:
+            prefix = init.prefix
+            break
+        else:
+            return
+        async for batch in batches(request_iterator):
+            for request in batch:
+                yield service_pb2.EchoOutput(out=prefix + request.str)
 
-async def start_server() -> None:
+
+async def start_server(
+    sock: Optional[socket.socket] = None, data_dir: Optional[str] = KV_DATA_DIR
+) -> None:
+    """Serve the test services on `sock`, or on port 8080 if it isn't given, keeping
+    kv state in `data_dir` if it is set."""
     logging.info("started server")
     assert SERVER_TRANSPORT_ID
     server = river.Server(
@@ -135,12 +618,22 @@ async def start_server() -> None:
             buffer_size=5000,
         ),
     )
-    kv_servicer = KvServicer()
-    service_river.add_kvServicer_to_server(kv_servicer, server)  # type: ignore
+    metrics = Metrics() if SERVER_METRICS else None
+    kv_servicer = KvServicer(data_dir=data_dir)
+    if kv_servicer.log is not None:
+        kv_servicer.log.start()
     upload_servicer = UploadServicer()
-    service_river.add_uploadServicer_to_server(upload_servicer, server)  # type: ignore
     repeat_servicer = RepeatServicer()
-    service_river.add_repeatServicer_to_server(repeat_servicer, server)  # type: ignore
+    kv, upload, repeat = kv_servicer, upload_servicer, repeat_servicer
+    if metrics is not None:
+        kv = metrics.instrument("kv", kv_servicer)
+        upload = metrics.instrument("upload", upload_servicer)
+        repeat = metrics.instrument("repeat", repeat_servicer)
+        metrics.collect(kv_servicer.collect_metrics)
+        metrics.collect(upload_servicer.collect_metrics)
+    service_river.add_kvServicer_to_server(kv, server)  # type: ignore
+    service_river.add_uploadServicer_to_server(upload, server)  # type: ignore
+    service_river.add_repeatServicer_to_server(repeat, server)  # type: ignore
     done: asyncio.Future[None] = asyncio.Future()
     started: asyncio.Future[None] = asyncio.Future()
 
@@ -150,22 +643,47 @@ async def start_server() -> None:
     ) -> Optional[Response]:  # noqa: E501, F821
         if request.path == "/healthz":
             return Response(200, "OK", Headers(), b"OK\n")  # noqa: F821
+        if request.path == "/metrics" and metrics is not None:
+            headers = Headers([("Content-Type", CONTENT_TYPE)])
+            return Response(200, "OK", headers, metrics.render().encode())
         return None
 
     async def _serve() -> None:
         async with serve(
             server.serve,
-            host="0.0.0.0",
-            port=8080,
+            host=None if sock else HOST,
+            port=None if sock else LISTEN_PORT,
+            sock=sock,
             process_request=process_request,
         ):
             started.set_result(None)
             logging.info("started test")
+            log_time_to_ready("server")
             await done
 
-    async with asyncio.TaskGroup() as tg:
-        tg.create_task(_serve())
+    with diagnostics("server"):
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_serve())
 
 
 if __name__ == "__main__":
-    asyncio.run(start_server())
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes to serve from. See testservice.workers for how sessions "
+        "and kv state are split between them.",
+    )
+    args, _ = parser.parse_known_args()
+    if args.workers > 1:
+        from testservice.workers import run_workers
+
+        def serve_worker(sock: socket.socket, index: int) -> None:
+            # Workers must not share a log, as each has its own store.
+            data_dir = KV_DATA_DIR and os.path.join(KV_DATA_DIR, f"worker-{index}")
+            loop.run(start_server(sock, data_dir))
+
+        run_workers(args.workers, HOST, LISTEN_PORT, serve_worker)
+    else:
+        loop.run(start_server())
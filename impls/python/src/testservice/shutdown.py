@@ -0,0 +1,62 @@
+"""Work the client and server do before they exit, however they are stopped.
+
+The driver stops them with SIGTERM, which skips `finally` blocks and `atexit`. Once
+`install` has run, SIGTERM runs the registered hooks before the process dies of it;
+a normal exit runs them through `atexit`. Either way, each hook runs at most once.
+"""
+
+import atexit
+import os
+import signal
+import traceback
+from types import FrameType
+from typing import Callable, Optional
+
+Hook = Callable[[], None]
+
+_hooks: list[Hook] = []
+
+
+def register(hook: Hook) -> Hook:
+    """Run `hook` on shutdown. Hooks run newest first, so a hook can still use
+    whatever was set up before it was registered.
+
+    Returns a function that runs `hook` right away instead, unless it already ran.
+    """
+    _hooks.append(hook)
+
+    def run_now() -> None:
+        if hook in _hooks:
+            _hooks.remove(hook)
+            _run(hook)
+
+    return run_now
+
+
+def _run(hook: Hook) -> None:
+    try:
+        hook()
+    except Exception:
+        # Logging may already be shut down, and the remaining hooks must still run.
+        traceback.print_exc()
+
+
+def run_hooks() -> None:
+    while _hooks:
+        _run(_hooks.pop())
+
+
+def _run_hooks_and_terminate(signum: int, frame: Optional[FrameType]) -> None:
+    """Run the hooks, then die of `signum` as if it weren't handled."""
+    run_hooks()
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
+
+def install() -> None:
+    """Run the hooks on SIGTERM, unless something else already handles it."""
+    if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, _run_hooks_and_terminate)
+
+
+atexit.register(run_hooks)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import stat
+import sys
+from typing import Any, Awaitable, Callable
+
+try:
+    import orjson
+
+    loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:  # pragma: no cover - orjson is an optional extra
+    loads = json.loads
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one handler covers both.
+JSONDecodeError = json.JSONDecodeError
+
+CHUNK_SIZE = 256 * 1024
+# Parsed actions the reader may get ahead of the client by before it stops reading.
+MAX_PENDING_ACTIONS = 4096
+
+
+def parse_action(line: bytes) -> Any:
+    try:
+        return loads(line)
+    except JSONDecodeError as e:
+        # Sometimes docker injects this into the stream:
+        # {"hijack":true,"stream":true,"stdin":true,"stdout":true,"stderr":true}{"type": "invoke", ...  # noqa: E501
+        offset = e.colno - 1
+        first = loads(line[0:offset])
+        assert "hijack" in first
+        return loads(line[offset:])
+
+
+class StdinReader:
+    """Reads driver commands from stdin in large chunks and parses them into actions.
+
+    Parsed actions are put on `actions`; `None` marks the end of input, and an
+    exception a failure to read or parse it, for the consumer to raise. Reading
+    pauses while `max_pending` actions are waiting to be taken.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING_ACTIONS) -> None:
+        self.actions: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_pending)
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        try:
+            read = await self._open()
+            # Pieces of a line that spans several chunks, joined once it ends.
+            partial: list[bytes] = []
+            while chunk := await read():
+                end = chunk.rfind(b"\n")
+                if end < 0:
+                    partial.append(chunk)
+                    continue
+                partial.append(chunk[:end])
+                lines = b"".join(partial).split(b"\n")
+                partial = [chunk[end + 1 :]]
+                for line in lines:
+                    if line.strip():
+                        await self.actions.put(parse_action(line))
+            last = b"".join(partial)
+            if last.strip():
+                await self.actions.put(parse_action(last))
+        except Exception as e:
+            # A malformed command must not look like the end of input.
+            await self.actions.put(e)
+            return
+        await self.actions.put(None)
+
+    async def _open(self) -> Callable[[], Awaitable[bytes]]:
+        loop = asyncio.get_running_loop()
+        if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+            # Regular files can't be registered with the event loop (uvloop aborts
+            # rather than raising); fall back to chunked reads on the default
+            # executor.
+            return lambda: loop.run_in_executor(
+                None, os.read, sys.stdin.fileno(), CHUNK_SIZE
+            )
+        reader = asyncio.StreamReader(limit=CHUNK_SIZE)
+        await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), sys.stdin
+        )
+        return lambda: reader.read(CHUNK_SIZE)
@@ -0,0 +1,142 @@
+"""Run the server as several processes sharing one port through SO_REUSEPORT.
+
+River sessions live in the worker that accepted them, so every connection from a
+client has to reach the same worker, including reconnects. The listening sockets
+carry a classic BPF program that picks the worker from the client's IPv4 source
+address instead of the kernel's default 4-tuple hash, which would send a reconnect
+from a new source port to an arbitrary worker.
+
+kv state is not shared: each worker has its own store, so clients connecting from
+different addresses don't see each other's keys. With KV_DATA_DIR set, each worker
+keeps its log and snapshots in its own subdirectory of it.
+"""
+
+import ctypes
+import logging
+import os
+import signal
+import socket
+import struct
+import sys
+from typing import Callable
+
+# From <asm-generic/socket.h> and <linux/filter.h>; the socket module lacks them.
+SO_ATTACH_REUSEPORT_CBPF = 51
+SKF_NET_OFF = -0x100000
+BPF_LD_W_ABS = 0x00 | 0x00 | 0x20
+BPF_ALU_MOD_K = 0x04 | 0x90 | 0x00
+BPF_RET_A = 0x06 | 0x10
+# Offset of the source address in an IPv4 header.
+IPV4_SRC_OFFSET = 12
+
+
+class SockFilter(ctypes.Structure):
+    _fields_ = [
+        ("code", ctypes.c_uint16),
+        ("jt", ctypes.c_uint8),
+        ("jf", ctypes.c_uint8),
+        ("k", ctypes.c_uint32),
+    ]
+
+
+def route_by_source_address(sock: socket.socket, workers: int) -> None:
+    """Send each connection to socket number `source address % workers` of the
+    reuseport group `sock` belongs to."""
+    program = (SockFilter * 3)(
+        SockFilter(BPF_LD_W_ABS, 0, 0, (SKF_NET_OFF + IPV4_SRC_OFFSET) & 0xFFFFFFFF),
+        SockFilter(BPF_ALU_MOD_K, 0, 0, workers),
+        SockFilter(BPF_RET_A, 0, 0, 0),
+    )
+    # struct sock_fprog; the kernel copies the program during the call.
+    fprog = struct.pack("@HP", len(program), ctypes.addressof(program))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_REUSEPORT_CBPF, fprog)
+
+
+def reuseport_sockets(host: str, port: int, workers: int) -> list[socket.socket]:
+    """One listening socket per worker, all bound to `host`:`port`.
+
+    The kernel numbers the sockets of a reuseport group in the order they are
+    bound, which is the order returned here.
+    """
+    socks = []
+    for _ in range(workers):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        sock.listen(socket.SOMAXCONN)
+        sock.setblocking(False)
+        socks.append(sock)
+    try:
+        route_by_source_address(socks[0], workers)
+    except OSError as e:
+        logging.warning(
+            "can't route connections by source address, reconnecting sessions may "
+            "land on another worker: %s",
+            e,
+        )
+    return socks
+
+
+def run_workers(
+    workers: int, host: str, port: int, serve: Callable[[socket.socket, int], None]
+) -> None:
+    """Fork `workers` processes that each call `serve` with their own socket and
+    their index.
+
+    Exits once every worker has. If one exits early, or this process gets SIGTERM
+    or SIGINT, the rest are terminated.
+    """
+    socks = reuseport_sockets(host, port, workers)
+    pids: dict[int, int] = {}
+    for index, sock in enumerate(socks):
+        # logs.BackgroundHandler restarts its writer thread on both sides of the fork.
+        pid = os.fork()
+        if pid == 0:
+            for other in socks:
+                if other is not sock:
+                    other.close()
+            status = 0
+            try:
+                logging.info("worker %d of %d started", index, workers)
+                serve(sock, index)
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                logging.exception("worker %d failed", index)
+                status = 1
+            finally:
+                # os._exit skips atexit, so write out the queued records here.
+                logging.shutdown()
+            os._exit(status)
+        pids[pid] = index
+    # Only the workers hold the sockets now, so they close when the workers exit.
+    for sock in socks:
+        sock.close()
+
+    stopping = False
+
+    def stop(signum: int, _: object) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    status = 0
+    while pids:
+        pid, wait_status = os.wait()
+        index = pids.pop(pid)
+        if not stopping:
+            logging.error(
+                "worker %d exited with %d, stopping the rest",
+                index,
+                os.waitstatus_to_exitcode(wait_status),
+            )
+            status = 1
+            stop(signal.SIGTERM, None)
+    sys.exit(status)
@@ -0,0 +1,39 @@
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+
+def test_sigterm_writes_latency_report(tmp_path: Path) -> None:
+    report = tmp_path / "latency.json"
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(SRC),
+        # Nothing listens here; the client only connects once it gets a command.
+        "PORT": "9",
+        "RIVER_SERVER": "127.0.0.1",
+        "CLIENT_TRANSPORT_ID": "client",
+        "SERVER_TRANSPORT_ID": "server",
+        "CLIENT_LATENCY_FILE": str(report),
+    }
+    # stdin stays open, as the driver leaves it.
+    client = subprocess.Popen(
+        [sys.executable, "-m", "testservice.client"],
+        stdin=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+    )
+    try:
+        assert client.stderr is not None
+        for line in client.stderr:
+            if b"start python river client" in line:
+                break
+        client.send_signal(signal.SIGTERM)
+        assert client.wait(timeout=10) == -signal.SIGTERM
+    finally:
+        client.kill()
+        client.wait()
+    assert report.read_text() == "{}\n"
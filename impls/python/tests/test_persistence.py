@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+from testservice.kvstore import KvStore
+from testservice.persistence import LOG_PREFIX, SNAPSHOT_NAME, KvLog, encode_record
+
+
+async def write(
+    directory: Path, entries: list[tuple[str, float]], snapshot_every: int = 100_000
+) -> None:
+    store = KvStore()
+    log = KvLog(store, str(directory), snapshot_every=snapshot_every)
+    log.load()
+    log.start()
+    for key, value in entries:
+        # As the server does: apply a set once its record is on disk.
+        await log.append(key, value)
+        store.set(key, value)
+    await log.close()
+
+
+def reload(directory: Path) -> tuple[int, dict[str, float], KvLog]:
+    store = KvStore()
+    log = KvLog(store, str(directory))
+    replayed = log.load()
+    return replayed, dict(store.items()), log
+
+
+async def test_load_drops_torn_record(tmp_path: Path) -> None:
+    await write(tmp_path, [("a", 1.0), ("b", 2.0)])
+    path = tmp_path / f"{LOG_PREFIX}0"
+    complete = path.stat().st_size
+    # A crash partway through writing the next record.
+    with open(path, "ab") as f:
+        f.write(encode_record("torn", 3.0)[:-2])
+
+    replayed, values, log = reload(tmp_path)
+    assert replayed == 2
+    assert values == {"a": 1.0, "b": 2.0}
+    assert path.stat().st_size == complete
+    await log.close()
+
+    # New records go after the last complete one, so they replay.
+    await write(tmp_path, [("c", 4.0)])
+    replayed, values, log = reload(tmp_path)
+    assert replayed == 3
+    assert values == {"a": 1.0, "b": 2.0, "c": 4.0}
+    await log.close()
+
+
+async def test_load_replays_snapshot_and_later_logs(tmp_path: Path) -> None:
+    entries = [(f"key-{i % 3}", float(i)) for i in range(10)]
+    await write(tmp_path, entries, snapshot_every=4)
+    assert (tmp_path / SNAPSHOT_NAME).exists()
+    # Logs covered by the last snapshot have been removed.
+    logs = [name for name in os.listdir(tmp_path) if name.startswith(LOG_PREFIX)]
+    assert len(logs) == 1
+
+    _, values, log = reload(tmp_path)
+    assert values == {"key-0": 9.0, "key-1": 7.0, "key-2": 8.0}
+    await log.close()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""fast-river-codecs.py: Rewrite the generated River <-> protobuf codecs.
+
+river.codegen emits decoders that build an empty message and then `setattr` each
+field, and encoders that copy each field into a dict behind an `is not None` check
+that proto3 fields never fail. For messages made only of scalars, repeated scalars
+and other such messages, this replaces them with:
+
+- decoders that hand the payload straight to the message constructor, falling back
+  to picking out known fields if the payload carries unknown keys, and
+- encoders that build the dict in a single literal.
+
+Messages using oneofs, well-known types, or fields whose wire name differs from the
+proto name keep the generated codecs.
+
+Usage: fast-river-codecs.py <service_river.py> <pb2 module>
+"""
+
+import importlib
+import re
+import sys
+
+from google.protobuf import descriptor_pb2
+from replit_river.codegen.server import (
+    get_decoder_name,
+    get_encoder_name,
+    to_camel_case,
+)
+
+FieldProto = descriptor_pb2.FieldDescriptorProto
+# Imports river.codegen emits whether or not any codec uses them, by the name they
+# bind. Loading the well-known types costs startup time for nothing.
+OPTIONAL_IMPORTS = {
+    "datetime": "import datetime\n",
+    "timestamp_pb2": "from google.protobuf import timestamp_pb2\n",
+    "BoolValue": "from google.protobuf.wrappers_pb2 import BoolValue\n",
+}
+
+
+def is_plain(
+    message: descriptor_pb2.DescriptorProto,
+    messages: dict[str, descriptor_pb2.DescriptorProto],
+) -> bool:
+    for field in message.field:
+        if field.HasField("oneof_index") or to_camel_case(field.name) != field.name:
+            return False
+        if field.type == FieldProto.TYPE_MESSAGE:
+            nested = messages.get(field.type_name.rsplit(".", 1)[-1])
+            if nested is None or not is_plain(nested, messages):
+                return False
+    return True
+
+
+def encoder(message: descriptor_pb2.DescriptorProto, module: str) -> str:
+    items = []
+    for field in message.field:
+        value = f"e.{field.name}"
+        if field.type == FieldProto.TYPE_MESSAGE:
+            encode = get_encoder_name(field)
+            if field.label == FieldProto.LABEL_REPEATED:
+                value = f"[{encode}(item) for item in {value}]"
+            else:
+                value = f"{encode}({value})"
+        elif field.label == FieldProto.LABEL_REPEATED:
+            value = f"list({value})"
+        items.append(f"        {field.name!r}: {value},\n")
+    return (
+        f"def _{message.name}Encoder(e: {module}.{message.name}) -> dict[str, Any]:\n"
+        f"    return {{\n{''.join(items)}    }}\n"
+    )
+
+
+def decoder(message: descriptor_pb2.DescriptorProto, module: str) -> str:
+    scalars = []
+    kwargs = []
+    for field in message.field:
+        if field.type != FieldProto.TYPE_MESSAGE:
+            scalars.append(repr(field.name))
+            continue
+        value = f"d.get({field.name!r})"
+        decode = get_decoder_name(field)
+        if field.label == FieldProto.LABEL_REPEATED:
+            value = f"[{decode}(item) for item in {value} or ()]"
+        else:
+            value = f"None if {value} is None else {decode}(d[{field.name!r}])"
+        kwargs.append(f"            {field.name}={value},\n")
+    if scalars:
+        known = f"{{{', '.join(scalars)}}}"
+        kwargs.insert(
+            0, f"            **{{k: v for k, v in d.items() if k in {known}}},\n"
+        )
+    constructor = f"{module}.{message.name}"
+    return (
+        f"def _{message.name}Decoder(\n"
+        f"    d: Mapping[str, Any],\n"
+        f") -> {constructor}:\n"
+        f"    if d is None:\n"
+        f"        return {constructor}()\n"
+        f"    try:\n"
+        f"        return {constructor}(**d)\n"
+        f"    except ValueError:\n"
+        f"        # The payload has keys this message doesn't know about.\n"
+        f"        return {constructor}(\n{''.join(kwargs)}        )\n"
+    )
+
+
+def main() -> None:
+    path, module_name = sys.argv[1:]
+    module = importlib.import_module(module_name)
+    file_proto = descriptor_pb2.FileDescriptorProto()
+    module.DESCRIPTOR.CopyToProto(file_proto)
+    messages = {message.name: message for message in file_proto.message_type}
+    alias = module_name.rsplit(".", 1)[-1]
+
+    with open(path) as f:
+        source = f.read()
+    for name, message in messages.items():
+        if not is_plain(message, messages):
+            continue
+        source, encoders = re.subn(
+            rf"^def _{name}Encoder\(.*?^    return d\n",
+            lambda _: encoder(message, alias),
+            source,
+            flags=re.MULTILINE | re.DOTALL,
+        )
+        source, decoders = re.subn(
+            rf"^def _{name}Decoder\(.*?^    return m\n",
+            lambda _: decoder(message, alias),
+            source,
+            flags=re.MULTILINE | re.DOTALL,
+        )
+        if encoders != 1 or decoders != 1:
+            sys.exit(f"expected one generated encoder and decoder for {name}")
+        print(f"Rewrote codecs for {name}", file=sys.stderr)
+    for name, line in OPTIONAL_IMPORTS.items():
+        if line in source and len(re.findall(rf"\b{name}\b", source)) == 1:
+            source = source.replace(line, "", 1)
+    # Close up import groups left empty.
+    source = re.sub(r"\n{3,}(?=import |from )", "\n\n", source)
+    with open(path, "w") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    main()
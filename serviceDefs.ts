@@ -29,7 +29,11 @@ export class Observable<T> {
 
 const KVService = ServiceSchema.define(
   {
-    initializeState: () => ({ kv: new Map<string, Observable<number>>() }),
+    initializeState: () => ({
+      kv: new Map<string, Observable<number>>(),
+      // Called with the changed keys of each set or mset, in order.
+      prefixWatchers: new Set<(changes: Map<string, number>) => void>(),
+    }),
   },
   {
     set: Procedure.rpc({
@@ -44,6 +48,8 @@ const KVService = ServiceSchema.define(
         }
 
         observable.set(() => v);
+        const changes = new Map([[k, v]]);
+        ctx.state.prefixWatchers.forEach((watcher) => watcher(changes));
         return Ok({ v: observable.get() });
       },
     }),
@@ -67,7 +73,91 @@ const KVService = ServiceSchema.define(
           return;
         }
 
-        observable.observe((v) => out.push(Ok({ v })));
+        // Unsubscribes once the stream closes.
+        return observable.observe((v) => out.push(Ok({ v })));
+      },
+    }),
+    mset: Procedure.rpc({
+      input: Type.Object({
+        entries: Type.Array(
+          Type.Object({ k: Type.String(), v: Type.Number() }),
+        ),
+      }),
+      output: Type.Object({ vs: Type.Array(Type.Number()) }),
+      errors: Type.Never(),
+      async handler(ctx, { entries }) {
+        // Watchers see each key once, with its last value in the batch, and
+        // prefix watchers get one frame for the whole batch.
+        const changes = new Map<string, number>();
+        for (const { k, v } of entries) {
+          changes.set(k, v);
+        }
+
+        for (const [k, v] of changes) {
+          let observable = ctx.state.kv.get(k);
+          if (!observable) {
+            observable = new Observable(v);
+            ctx.state.kv.set(k, observable);
+          }
+
+          observable.set(() => v);
+        }
+
+        ctx.state.prefixWatchers.forEach((watcher) => watcher(changes));
+
+        return Ok({ vs: entries.map(({ v }) => v) });
+      },
+    }),
+    mget: Procedure.rpc({
+      input: Type.Object({ ks: Type.Array(Type.String()) }),
+      output: Type.Object({ vs: Type.Array(Type.Number()) }),
+      errors: Type.Object({
+        code: Type.Literal('NOT_FOUND'),
+        message: Type.String(),
+      }),
+      async handler(ctx, { ks }) {
+        const vs: number[] = [];
+        for (const k of ks) {
+          const observable = ctx.state.kv.get(k);
+          if (!observable) {
+            return Err({
+              code: 'NOT_FOUND',
+              message: `key ${k} wasn't found`,
+            });
+          }
+
+          vs.push(observable.get());
+        }
+
+        return Ok({ vs });
+      },
+    }),
+    watch_prefix: Procedure.subscription({
+      input: Type.Object({ prefix: Type.String() }),
+      output: Type.Object({
+        changes: Type.Array(
+          Type.Object({ k: Type.String(), v: Type.Number() }),
+        ),
+      }),
+      errors: Type.Never(),
+      async handler(ctx, { prefix }, out) {
+        const changes = [...ctx.state.kv.entries()]
+          .filter(([k]) => k.startsWith(prefix))
+          .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+          .map(([k, observable]) => ({ k, v: observable.get() }));
+        out.push(Ok({ changes }));
+
+        const watcher = (changed: Map<string, number>) => {
+          const changes = [...changed]
+            .filter(([k]) => k.startsWith(prefix))
+            .map(([k, v]) => ({ k, v }));
+          if (changes.length > 0) {
+            out.push(Ok({ changes }));
+          }
+        };
+        ctx.state.prefixWatchers.add(watcher);
+        // Stops watching once the stream closes.
+        return () => ctx.state.prefixWatchers.delete(watcher);
       },
     }),
   },
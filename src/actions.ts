@@ -54,6 +54,27 @@ export type InvokeAction =
       proc: 'kv.watch';
       payload: { k: string };
     }
+  | {
+      type: 'invoke';
+      id: string;
+      // rpc
+      proc: 'kv.mset';
+      payload: { entries: { k: string; v: number }[] };
+    }
+  | {
+      type: 'invoke';
+      id: string;
+      // rpc
+      proc: 'kv.mget';
+      payload: { ks: string[] };
+    }
+  | {
+      type: 'invoke';
+      id: string;
+      // subscription
+      proc: 'kv.watch_prefix';
+      payload: { prefix: string };
+    }
   | {
       type: 'invoke';
       id: string;
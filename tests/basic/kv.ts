@@ -208,6 +208,115 @@ const KvMultipleLongSubscription: Test = {
   },
 };
 
+const KvMsetMgetTest: Test = {
+  clients: {
+    client: {
+      actions: [
+        {
+          type: 'invoke',
+          id: '1',
+          proc: 'kv.set',
+          payload: { k: 'a', v: 0 },
+        },
+        { type: 'invoke', id: '2', proc: 'kv.watch', payload: { k: 'a' } },
+        { type: 'wait_response', id: '2' },
+        {
+          type: 'invoke',
+          id: '3',
+          proc: 'kv.mset',
+          payload: {
+            entries: [
+              { k: 'a', v: 1 },
+              { k: 'b', v: 2 },
+              { k: 'a', v: 3 },
+            ],
+          },
+        },
+        {
+          type: 'invoke',
+          id: '4',
+          proc: 'kv.mget',
+          payload: { ks: ['a', 'b'] },
+        },
+        {
+          type: 'invoke',
+          id: '5',
+          proc: 'kv.mget',
+          payload: { ks: ['a', 'missing'] },
+        },
+      ],
+      expectedOutput: [
+        { id: '1', status: 'ok', payload: 0 },
+        { id: '2', status: 'ok', payload: 0 },
+        // a key set twice in one batch is watched once, with its last value
+        { id: '2', status: 'ok', payload: 3 },
+        { id: '3', status: 'ok', payload: '1,2,3' },
+        { id: '4', status: 'ok', payload: '3,2' },
+        { id: '5', status: 'err', payload: 'NOT_FOUND' },
+      ],
+    },
+  },
+};
+
+const KvWatchPrefixTest: Test = {
+  // Frames are not ordered relative to the responses of the sets they carry.
+  unordered: true,
+  clients: {
+    client: {
+      actions: [
+        {
+          type: 'invoke',
+          id: '1',
+          proc: 'kv.set',
+          payload: { k: 'p/b', v: 2 },
+        },
+        {
+          type: 'invoke',
+          id: '2',
+          proc: 'kv.set',
+          payload: { k: 'p/a', v: 1 },
+        },
+        {
+          type: 'invoke',
+          id: '3',
+          proc: 'kv.set',
+          payload: { k: 'q/x', v: 5 },
+        },
+        {
+          type: 'invoke',
+          id: '4',
+          proc: 'kv.watch_prefix',
+          payload: { prefix: 'p/' },
+        },
+        { type: 'wait_response', id: '4' },
+        {
+          type: 'invoke',
+          id: '5',
+          proc: 'kv.mset',
+          payload: {
+            entries: [
+              { k: 'p/c', v: 3 },
+              { k: 'q/y', v: 4 },
+              { k: 'p/a', v: 10 },
+              { k: 'p/c', v: 30 },
+            ],
+          },
+        },
+      ],
+      expectedOutput: [
+        { id: '1', status: 'ok', payload: 2 },
+        { id: '2', status: 'ok', payload: 1 },
+        { id: '3', status: 'ok', payload: 5 },
+        // the current values under the prefix, sorted by key
+        { id: '4', status: 'ok', payload: 'p/a=1,p/b=2' },
+        // one frame for the batch, with the last value of each key in it
+        { id: '4', status: 'ok', payload: 'p/c=30,p/a=10' },
+        { id: '5', status: 'ok', payload: '3,4,10,30' },
+      ],
+    },
+  },
+};
+
 export default {
   KvRpcTest,
   KvSubscribeTest,
@@ -215,4 +324,6 @@ export default {
   KvSubscribeMultipleTest,
   KvLongSubscription,
   KvMultipleLongSubscription,
+  KvMsetMgetTest,
+  KvWatchPrefixTest,
 };